@@ -42,18 +42,34 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'drf_spectacular',
     'recipe',
-    'user'
+    'user',
+    'batch',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.PrefixMiddleware',
+]
+
+# Middleware run after MIDDLEWARE, chosen by the first matching prefix.
+# The token-authenticated API never touches sessions, messages or CSRF.
+FULL_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+PREFIX_MIDDLEWARE = [
+    ('/api/', [
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]),
+    ('', FULL_MIDDLEWARE),
+]
+# The admin finds its middleware in the '' chain above, which the admin
+# checks cannot see.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 ROOT_URLCONF = 'app.urls'
 
@@ -91,6 +107,38 @@ DATABASES = {
 }
 
 
+# Cache
+# Use a shared backend (e.g. memcached) in production so cached data and
+# invalidation are consistent across worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    # Pages of the public recipe feed (core.feed), shared by all users.
+    # Their invalidation counters live in the default cache.
+    'feed': {
+        'BACKEND': os.environ.get(
+            'FEED_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('FEED_CACHE_LOCATION', 'feed'),
+        'KEY_PREFIX': 'feed',
+        'TIMEOUT': int(os.environ.get('FEED_CACHE_TIMEOUT', 300)),
+    },
+}
+if CACHES['feed']['BACKEND'].endswith('LocMemCache'):
+    # Bound the number of cached pages; shared backends have their own
+    # memory limit.
+    CACHES['feed']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.environ.get('FEED_CACHE_MAX_PAGES', 1000)),
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -141,10 +189,54 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'core.User'
 
 # DRF settings
+# Lifetimes in seconds of core.authentication signed access tokens and
+# their database-backed refresh tokens.
+ACCESS_TOKEN_LIFETIME = int(os.environ.get('ACCESS_TOKEN_LIFETIME', 900))
+REFRESH_TOKEN_LIFETIME = int(
+    os.environ.get('REFRESH_TOKEN_LIFETIME', 30 * 24 * 3600)
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Token bucket rates of core.throttling.ScopedTokenBucketThrottle.
+    'DEFAULT_THROTTLE_RATES': {
+        'token': os.environ.get('THROTTLE_TOKEN_RATE', '10/min'),
+        'upload': os.environ.get('THROTTLE_UPLOAD_RATE', '30/min'),
+        'recipe_list': os.environ.get('THROTTLE_RECIPE_LIST_RATE', '120/min'),
+    },
+    # Reverse proxies in front of the app. Anonymous clients are throttled
+    # by address, so with none X-Forwarded-For is ignored and REMOTE_ADDR
+    # is used; clients could otherwise pick their own address.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
+# Schema written at build time and served by core.views.CachedSchemaView;
+# without it the schema is generated once per process.
+OPENAPI_SCHEMA_FILE = os.environ.get(
+    'OPENAPI_SCHEMA_FILE', str(BASE_DIR / 'openapi-schema.json')
+)
+SCHEMA_CACHE_MAX_AGE = int(os.environ.get('SCHEMA_CACHE_MAX_AGE', 86400))
+
+# Upper bound on the tag and ingredient assignments held by the per-process
+# core.similarity indexes; least recently used users are evicted first.
+SIMILARITY_INDEX_MAX_SIZE = int(
+    os.environ.get('SIMILARITY_INDEX_MAX_SIZE', 2000000)
+)
+
+# Number of serialized recipes kept by each process' core.detail_cache.
+RECIPE_DETAIL_CACHE_SIZE = int(
+    os.environ.get('RECIPE_DETAIL_CACHE_SIZE', 10000)
+)
+
+# Seconds the per-process core.detail_cache and core.similarity caches
+# serve an entry; 0 for no limit. Their entries are checked against data
+# versions in the default cache, which only see other workers' writes when
+# that cache is shared, so with the local-memory default they expire.
+PROCESS_CACHE_TTL = int(os.environ.get(
+    'PROCESS_CACHE_TTL',
+    30 if CACHES['default']['BACKEND'].endswith('LocMemCache') else 0,
+))
+
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
\ No newline at end of file
@@ -1,15 +1,15 @@
-from drf_spectacular.views import (
-    SpectacularAPIView, SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 
 from django.conf import settings
 
+from core.views import CachedSchemaView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', CachedSchemaView.as_view(), name='schema'),
     path(
         'api/docs/',
         SpectacularSwaggerView.as_view(url_name='schema'),
@@ -17,6 +17,7 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('api/recipe/', include('recipe.urls')),
+    path('api/batch/', include('batch.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,49 @@
+"""
+Serializers for the batch API
+"""
+from rest_framework import serializers
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """Serializer for one request inside a batch"""
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+    )
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(
+        child=serializers.CharField(), required=False
+    )
+
+    def validate_path(self, value):
+        """Only allow API paths, and no nested batches."""
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError('Path must start with /api/.')
+        if value.split('?')[0].rstrip('/') == '/api/batch':
+            raise serializers.ValidationError('Batches cannot be nested.')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """Serializer for a batch of API requests"""
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        max_size = self.context['max_size']
+        if len(value) > max_size:
+            raise serializers.ValidationError(
+                f'A batch holds at most {max_size} requests.'
+            )
+        return value
+
+
+class SubResponseSerializer(serializers.Serializer):
+    """Serializer for the response to one request inside a batch"""
+    status = serializers.IntegerField()
+    body = serializers.JSONField(allow_null=True)
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    """Serializer for the responses to a batch, in request order"""
+    responses = SubResponseSerializer(many=True)
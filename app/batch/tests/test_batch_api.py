@@ -0,0 +1,135 @@
+"""
+Tests for the batch API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+
+BATCH_URL = reverse('batch:batch')
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {'title': 'Soup', 'time_minutes': 10, 'price': Decimal('5')}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class PublicBatchApiTests(TestCase):
+    """Test unauthenticated batch requests."""
+
+    def test_auth_required(self):
+        """Test the batch itself must be authenticated."""
+        res = APIClient().post(BATCH_URL, {'requests': []}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateBatchApiTests(TestCase):
+    """Test authenticated batch requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123', name='Test User'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_batch_reads(self):
+        """Test sub-requests run as the batch user, in order."""
+        recipe = create_recipe(self.user)
+        Tag.objects.create(user=self.user, name='Dinner')
+        payload = {'requests': [
+            {'method': 'GET', 'path': '/api/user/me/'},
+            {'method': 'GET', 'path': '/api/recipe/tags/?fields=name'},
+            {'method': 'GET', 'path': f'/api/recipe/recipes/{recipe.id}/'},
+        ]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        me, tags, detail = res.data['responses']
+        self.assertEqual(me['status'], status.HTTP_200_OK)
+        self.assertEqual(me['body']['email'], 'user@example.com')
+        self.assertEqual(tags['body'], [{'name': 'Dinner'}])
+        self.assertEqual(detail['body']['title'], 'Soup')
+
+    def test_batch_write(self):
+        """Test writes with a body are dispatched to the view."""
+        payload = {'requests': [
+            {
+                'method': 'POST', 'path': '/api/recipe/recipes/',
+                'body': {'title': 'Stew', 'time_minutes': 5, 'price': '2'},
+            },
+            {'method': 'GET', 'path': '/api/recipe/recipes/'},
+        ]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        created, listed = res.data['responses']
+        self.assertEqual(created['status'], status.HTTP_201_CREATED)
+        self.assertEqual(listed['body'][0]['title'], 'Stew')
+        self.assertTrue(Recipe.objects.filter(user=self.user).exists())
+
+    def test_sub_request_errors(self):
+        """Test failing sub-requests report their own status."""
+        other = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        recipe = create_recipe(other)
+        payload = {'requests': [
+            {'method': 'GET', 'path': f'/api/recipe/recipes/{recipe.id}/'},
+            {'method': 'GET', 'path': '/api/missing/'},
+        ]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['status'] for item in res.data['responses']],
+            [status.HTTP_404_NOT_FOUND, status.HTTP_404_NOT_FOUND],
+        )
+
+    def test_invalid_batches(self):
+        """Test nested, non-API and oversized batches are rejected."""
+        invalid = [
+            [{'method': 'GET', 'path': '/api/batch/'}],
+            [{'method': 'GET', 'path': '/admin/'}],
+            [{'method': 'GET', 'path': '/api/user/me/'}] * 21,
+        ]
+        for requests in invalid:
+            res = self.client.post(
+                BATCH_URL, {'requests': requests}, format='json'
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ParallelBatchApiTests(TransactionTestCase):
+    """Test reads dispatched from worker threads."""
+
+    def test_parallel_reads(self):
+        """Test parallel GETs return every response in order."""
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123'
+        )
+        recipes = [create_recipe(user, title=f'r{i}') for i in range(5)]
+        client = APIClient()
+        client.force_authenticate(user)
+        payload = {'parallel': True, 'requests': [
+            {'method': 'GET', 'path': f'/api/recipe/recipes/{recipe.id}/'}
+            for recipe in recipes
+        ]}
+
+        res = client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(
+            [item['body']['title'] for item in res.data['responses']],
+            [f'r{i}' for i in range(5)],
+        )
@@ -0,0 +1,130 @@
+"""
+Views for the batch API
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema
+from rest_framework import authentication, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from batch.serializers import BatchResponseSerializer, BatchSerializer
+from core.authentication import SignedTokenAuthentication
+
+logger = logging.getLogger(__name__)
+
+
+class BatchView(APIView):
+    """
+    Run several API requests in one round trip.
+
+    The batch is authenticated once and every sub-request is dispatched
+    in-process to its view as that user, skipping the middleware stack.
+    Batches of GET requests may run in parallel threads.
+    """
+    authentication_classes = [
+        authentication.TokenAuthentication, SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAuthenticated]
+    max_size = 20
+    max_workers = 4
+
+    @extend_schema(
+        request=BatchSerializer, responses=BatchResponseSerializer
+    )
+    def post(self, request):
+        serializer = BatchSerializer(
+            data=request.data, context={'max_size': self.max_size}
+        )
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['requests']
+
+        parallel = serializer.validated_data['parallel'] and all(
+            item['method'] == 'GET' for item in items
+        )
+        if parallel and len(items) > 1:
+            workers = min(len(items), self.max_workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                responses = list(executor.map(self._run_in_thread, items))
+        else:
+            responses = [self._run(item) for item in items]
+        return Response({'responses': responses})
+
+    def _run_in_thread(self, item):
+        try:
+            return self._run(item)
+        finally:
+            # Worker threads open their own connection; don't leak it.
+            connection.close()
+
+    def _run(self, item):
+        """Dispatch one sub-request and return its status and body."""
+        url = urlsplit(item['path'])
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {
+                'status': status.HTTP_404_NOT_FOUND,
+                'body': {'detail': 'Not found.'},
+            }
+
+        try:
+            response = match.func(
+                self._build_request(item, url), *match.args, **match.kwargs
+            )
+        except Exception:
+            logger.exception('Batch sub-request %s failed', item['path'])
+            return {
+                'status': status.HTTP_500_INTERNAL_SERVER_ERROR,
+                'body': {'detail': 'Server error.'},
+            }
+        return {'status': response.status_code, 'body': self._body(response)}
+
+    def _build_request(self, item, url):
+        """Build a Django request that reuses the batch's authentication."""
+        body = b''
+        if 'body' in item:
+            body = json.dumps(item['body']).encode()
+        environ = {
+            key: value for key, value in self.request.META.items()
+            if not key.startswith('HTTP_') and key not in (
+                'CONTENT_TYPE', 'CONTENT_LENGTH',
+            )
+        }
+        environ.update({
+            'REQUEST_METHOD': item['method'],
+            'PATH_INFO': url.path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': url.query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_ACCEPT': 'application/json',
+            'HTTP_HOST': self.request.get_host(),
+            'wsgi.input': io.BytesIO(body),
+        })
+        for name, value in item.get('headers', {}).items():
+            environ['HTTP_' + name.upper().replace('-', '_')] = value
+
+        sub_request = WSGIRequest(environ)
+        # Picked up by DRF's Request, so sub-requests skip authentication.
+        sub_request._force_auth_user = self.request.user
+        sub_request._force_auth_token = self.request.auth
+        return sub_request
+
+    def _body(self, response):
+        """Return the unrendered data of a sub-response."""
+        if hasattr(response, 'data'):
+            return response.data
+        content = b''.join(response) if response.streaming \
+            else response.content
+        try:
+            return json.loads(content or 'null')
+        except ValueError:
+            return content.decode(errors='replace')
@@ -1,7 +1,10 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseAdmin
+from django.db import transaction
 
 from core import models
+from core.pagination import EstimatedCountPaginator
+from core.purge import request_user_deletion
 
 
 class UserAdmin(BaseAdmin):
@@ -22,9 +25,118 @@ class UserAdmin(BaseAdmin):
         ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser')}),
     )
 
+    def get_deleted_objects(self, objs, request):
+        """List only the users; collecting their data would load it all."""
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        return [str(obj) for obj in objs], {}, perms_needed, []
+
+    def delete_model(self, request, obj):
+        """Deactivate the user and purge their data in the background."""
+        request_user_deletion(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            request_user_deletion(obj)
+
+
+class UserDeletionAdmin(admin.ModelAdmin):
+    list_display = ['email', 'requested_at', 'progress', 'finished_at']
+    readonly_fields = [
+        'user', 'email', 'requested_at', 'finished_at',
+        'total_objects', 'deleted_objects',
+    ]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base admin for tables with millions of rows.
+
+    Lists are ordered by primary key, counted from planner estimates and
+    searched only through indexed lookups: numeric terms match the
+    primary key, other terms the `search_fields` (which use `=` so they
+    hit the UPPER() expression indexes). Deletes run in short batches.
+    """
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    actions = ['delete_in_batches']
+    delete_batch_size = 500
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        return super().get_search_results(request, queryset, term)
+
+    @admin.action(
+        description='Delete selected %(verbose_name_plural)s in batches',
+        permissions=['delete'],
+    )
+    def delete_in_batches(self, request, queryset):
+        """Delete by primary key ranges, one short transaction each."""
+        queryset = queryset.order_by('pk')
+        deleted = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[
+                    :self.delete_batch_size
+                ]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            with transaction.atomic():
+                self.model.objects.filter(pk__in=batch).delete()
+            deleted += len(batch)
+        self.message_user(
+            request,
+            f'Deleted {deleted} {self.opts.verbose_name_plural}.',
+            messages.SUCCESS,
+        )
+
+
+class RecipeIngredientInline(admin.TabularInline):
+    model = models.RecipeIngredient
+    autocomplete_fields = ['ingredient']
+    extra = 0
+
+
+class RecipeAdmin(LargeTableAdmin):
+    list_display = ['id', 'title', 'user', 'time_minutes', 'price']
+    search_fields = ['=title']
+    autocomplete_fields = ['tags']
+    inlines = [RecipeIngredientInline]
+
+
+class TagAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'user']
+    search_fields = ['=name']
+
+
+class IngredientAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'user']
+    search_fields = ['=name']
+
+
+class MeasurementUnitAdmin(admin.ModelAdmin):
+    list_display = ['name', 'base', 'factor']
+
 
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Recipe)
-admin.site.register(models.Tag)
+admin.site.register(models.UserDeletion, UserDeletionAdmin)
+admin.site.register(models.Recipe, RecipeAdmin)
+admin.site.register(models.Tag, TagAdmin)
+admin.site.register(models.Ingredient, IngredientAdmin)
+admin.site.register(models.MeasurementUnit, MeasurementUnitAdmin)
 
 # Add a blank line at the end of the file
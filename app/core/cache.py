@@ -0,0 +1,43 @@
+"""
+Helpers for caching data derived from a user's recipes.
+"""
+import time
+
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'recipe-data-version:{user_id}'
+
+
+def _initial_version():
+    """Return a fresh version that cannot collide with an evicted one."""
+    return int(time.time() * 1000)
+
+
+def get_versions(keys):
+    """Return the current value of each version counter in `keys`."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def bump_version(key):
+    """Move a version counter on, invalidating what was cached against it."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+        return cache.get(key)
+
+
+def get_data_version(user_id):
+    """Return the current version of a user's recipe data."""
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    return get_versions([key])[key]
+
+
+def bump_data_version(user_id):
+    """Invalidate everything cached against a user's recipe data."""
+    return bump_version(DATA_VERSION_KEY.format(user_id=user_id))
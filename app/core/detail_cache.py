@@ -0,0 +1,98 @@
+"""
+Per-process cache of serialized recipe details.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.cache import get_data_version
+
+
+class RecipeDetailCache:
+    """
+    LRU of recipe representations, each tagged with its owner.
+
+    Entries are stamped with the owner's data version when stored and are
+    stale once it moves on. Writers store the fresh representation straight
+    away. Writes handled by other processes are only seen when the default
+    cache holding the versions is shared; otherwise entries are trusted for
+    at most `settings.PROCESS_CACHE_TTL` seconds.
+    """
+
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.stale = self.evictions = 0
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return settings.RECIPE_DETAIL_CACHE_SIZE
+
+    def get(self, user_id, recipe_id):
+        """Return the cached representation, or None on a miss.
+
+        Recipes of other users are misses, so the regular lookup decides
+        how to respond to them.
+        """
+        with self._lock:
+            entry = self._entries.get(recipe_id)
+            if entry is None or entry[0] != user_id:
+                self.misses += 1
+                return None
+        version = get_data_version(user_id)
+        ttl = settings.PROCESS_CACHE_TTL
+        with self._lock:
+            current = self._entries.get(recipe_id) is entry
+            if entry[1] != version or (
+                ttl and time.monotonic() - entry[2] > ttl
+            ):
+                if current:
+                    del self._entries[recipe_id]
+                self.stale += 1
+                self.misses += 1
+                return None
+            if current:
+                self._entries.move_to_end(recipe_id)
+            self.hits += 1
+        return entry[3]
+
+    def set(self, user_id, recipe_id, version, data):
+        """Store `data`, read at data `version`, for the user's recipe."""
+        with self._lock:
+            self._entries.pop(recipe_id, None)
+            self._entries[recipe_id] = (
+                user_id, version, time.monotonic(), data
+            )
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, recipe_id):
+        """Drop the recipe's entry."""
+        with self._lock:
+            self._entries.pop(recipe_id, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale = self.evictions = 0
+
+    def stats(self):
+        """Return the size and hit, miss and eviction counters."""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': self.evictions,
+        }
+
+
+recipe_details = RecipeDetailCache()
@@ -0,0 +1,86 @@
+"""
+Cached pages of the public recipe feed, shared by all users.
+
+The feed lists public recipes newest first, one page per `before` cursor.
+Recipe IDs are grouped into shards of SHARD_SIZE, each with a version
+counter in the default cache. A cached page records the versions of the
+shards its ID range spans and is discarded once one of them moves on, so
+publishing, unpublishing or editing a recipe only invalidates the pages
+that list it or would list it.
+"""
+from django.core.cache import cache, caches
+from django.db import transaction
+
+from core.cache import bump_version, get_versions
+
+SHARD_SIZE = 1000
+# Pages spanning more shards than this, such as the last page of a sparse
+# feed, are not cached.
+MAX_SHARDS = 50
+SHARD_VERSION_KEY = 'public-feed-shard:{shard}'
+# The first page also covers recipes newer than any it lists.
+HEAD_VERSION_KEY = 'public-feed-head'
+HEAD_TOP_KEY = 'public-feed-head-top'
+PAGE_KEY = 'public-feed-page:{before}:{size}'
+
+
+def _shard(recipe_id):
+    return recipe_id // SHARD_SIZE
+
+
+def _version_keys(before, ids, has_more):
+    """Return the version keys of a page, or None if it spans too many."""
+    # Without more pages, any recipe published below would join this one.
+    low = ids[-1] if has_more else 0
+    if before is not None:
+        high = before - 1
+    else:
+        high = ids[0] if ids else 0
+    shards = range(_shard(low), _shard(high) + 1)
+    if len(shards) > MAX_SHARDS:
+        return None
+    keys = [SHARD_VERSION_KEY.format(shard=shard) for shard in shards]
+    if before is None:
+        keys.append(HEAD_VERSION_KEY)
+    return keys
+
+
+def get_page(before, size, build):
+    """
+    Return the feed page of up to `size` recipes with IDs below `before`.
+
+    `build()` loads the page on a cache miss and returns the listed IDs,
+    whether more recipes follow, and the page to cache.
+    """
+    pages = caches['feed']
+    key = PAGE_KEY.format(before=before or '', size=size)
+    entry = pages.get(key)
+    if entry is not None and get_versions(
+        list(entry['versions'])
+    ) == entry['versions']:
+        return entry['page']
+
+    ids, has_more, page = build()
+    keys = _version_keys(before, ids, has_more)
+    if keys is not None:
+        # A write committed between the query and this read goes
+        # unnoticed until the page expires, which bounds the staleness.
+        pages.set(key, {'versions': get_versions(keys), 'page': page})
+        if before is None:
+            cache.set(HEAD_TOP_KEY, ids[0] if ids else 0, timeout=None)
+    return page
+
+
+def _invalidate(recipe_ids):
+    for shard in {_shard(recipe_id) for recipe_id in recipe_ids}:
+        bump_version(SHARD_VERSION_KEY.format(shard=shard))
+    top = cache.get(HEAD_TOP_KEY)
+    if top is None or max(recipe_ids) > top:
+        bump_version(HEAD_VERSION_KEY)
+
+
+def invalidate_recipes(recipe_ids):
+    """Invalidate the pages listing `recipe_ids` once the write commits."""
+    recipe_ids = list(recipe_ids)
+    if recipe_ids:
+        transaction.on_commit(lambda: _invalidate(recipe_ids))
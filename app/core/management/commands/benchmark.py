@@ -0,0 +1,442 @@
+"""
+Django command to load test the API against a seeded dataset.
+"""
+import io
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.detail_cache import recipe_details
+from core.models import Recipe, Tag, Ingredient
+
+BENCH_EMAIL_PREFIX = 'bench-'
+BENCH_PASSWORD = 'benchpass123'
+BATCH_SIZE = 5000
+
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of a sorted list of samples."""
+    if not samples:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(samples))) - 1, 0)
+    return samples[min(rank, len(samples) - 1)]
+
+
+def bench_email(index):
+    """Return the email address of the seeded benchmark user `index`."""
+    return f'{BENCH_EMAIL_PREFIX}{index}@example.com'
+
+
+def _jpeg_bytes():
+    """Return a tiny JPEG image used for the upload scenario."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (10, 10)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    """Django command to seed data and benchmark every API endpoint"""
+
+    help = (
+        'Seed a configurable dataset and report throughput and latency '
+        'percentiles for every API endpoint at several concurrency levels.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--recipes', type=int, default=100,
+            help='Recipes per user.',
+        )
+        parser.add_argument(
+            '--tags', type=int, default=20, help='Tags per user.',
+        )
+        parser.add_argument(
+            '--ingredients', type=int, default=50,
+            help='Ingredients per user.',
+        )
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=6)
+        parser.add_argument(
+            '--concurrency', default='1,4,16',
+            help='Comma-separated list of concurrency levels.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Requests per endpoint and concurrency level.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', default=None,
+            help='Write the results as JSON to this path.',
+        )
+        parser.add_argument(
+            '--full-middleware', action='store_true',
+            help='Run /api/ requests through the full middleware chain.',
+        )
+        parser.add_argument(
+            '--keep-data', action='store_true',
+            help='Do not delete the seeded data after the run.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [
+                int(level) for level in options['concurrency'].split(',')
+            ]
+        except ValueError:
+            raise CommandError('--concurrency must be comma-separated ints.')
+        if options['users'] < 1 or any(level < 1 for level in levels):
+            raise CommandError('--users and --concurrency must be positive.')
+
+        self.rng = random.Random(options['seed'])
+        self.options = options
+
+        self.stdout.write('Seeding benchmark data...')
+        self._purge()
+        started = time.perf_counter()
+        self.dataset = self._seed()
+        seed_seconds = time.perf_counter() - started
+        self.stdout.write(f'Seeded in {seed_seconds:.2f}s')
+
+        results = []
+        try:
+            with tempfile.TemporaryDirectory() as media_root, \
+                    override_settings(
+                        DEBUG=False,
+                        MEDIA_ROOT=media_root,
+                        ALLOWED_HOSTS=['testserver'],
+                        REST_FRAMEWORK={
+                            **settings.REST_FRAMEWORK,
+                            'DEFAULT_THROTTLE_RATES': {},
+                        },
+                        **self._middleware_settings(),
+                    ):
+                for level in levels:
+                    for name, scenario in self._scenarios():
+                        result = self._run(name, scenario, level)
+                        results.append(result)
+                        self._report(result)
+        finally:
+            if not options['keep_data']:
+                self._purge()
+
+        report = {
+            'meta': {
+                'started_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'seed_seconds': round(seed_seconds, 3),
+                'params': {
+                    key: options[key] for key in (
+                        'users', 'recipes', 'tags', 'ingredients',
+                        'tags_per_recipe', 'ingredients_per_recipe',
+                        'requests', 'seed', 'full_middleware',
+                    )
+                },
+                'concurrency': levels,
+                'recipe_detail_cache': recipe_details.stats(),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete!'))
+
+    def _purge(self):
+        """Remove users (and cascaded data) created by a previous run."""
+        get_user_model().objects.filter(
+            email__startswith=BENCH_EMAIL_PREFIX
+        ).delete()
+
+    def _seed(self):
+        """Bulk insert the benchmark dataset and return its identifiers."""
+        opts = self.options
+        rng = self.rng
+        password = make_password(BENCH_PASSWORD)
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(
+                    email=bench_email(i), name=f'Bench {i}',
+                    password=password,
+                )
+                for i in range(opts['users'])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        tokens = Token.objects.bulk_create(
+            [Token(user=user, key=Token.generate_key()) for user in users],
+            batch_size=BATCH_SIZE,
+        )
+
+        dataset = []
+        recipe_tags = Recipe.tags.through
+        recipe_ingredients = Recipe.ingredients.through
+        for user, token in zip(users, tokens):
+            tags = Tag.objects.bulk_create(
+                [
+                    Tag(user=user, name=f'tag {i}')
+                    for i in range(opts['tags'])
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            ingredients = Ingredient.objects.bulk_create(
+                [
+                    Ingredient(user=user, name=f'ingredient {i}')
+                    for i in range(opts['ingredients'])
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            recipes = Recipe.objects.bulk_create(
+                [
+                    Recipe(
+                        user=user,
+                        title=f'recipe {i}',
+                        description='Benchmark recipe. ' * 20,
+                        time_minutes=rng.randint(5, 240),
+                        price=Decimal(rng.randint(100, 99999)) / 100,
+                    )
+                    for i in range(opts['recipes'])
+                ],
+                batch_size=BATCH_SIZE,
+            )
+            tag_rows = []
+            ingredient_rows = []
+            for recipe in recipes:
+                for tag in rng.sample(
+                    tags, min(opts['tags_per_recipe'], len(tags))
+                ):
+                    tag_rows.append(
+                        recipe_tags(recipe_id=recipe.id, tag_id=tag.id)
+                    )
+                for ingredient in rng.sample(
+                    ingredients,
+                    min(opts['ingredients_per_recipe'], len(ingredients)),
+                ):
+                    ingredient_rows.append(recipe_ingredients(
+                        recipe_id=recipe.id, ingredient_id=ingredient.id,
+                        quantity=rng.randint(1, 500), measurement='g',
+                    ))
+            recipe_tags.objects.bulk_create(tag_rows, batch_size=BATCH_SIZE)
+            recipe_ingredients.objects.bulk_create(
+                ingredient_rows, batch_size=BATCH_SIZE
+            )
+            dataset.append({
+                'email': user.email,
+                'token': token.key,
+                'recipes': [recipe.id for recipe in recipes],
+                'tags': [tag.id for tag in tags],
+                'ingredients': [ingredient.id for ingredient in ingredients],
+            })
+        return dataset
+
+    def _middleware_settings(self):
+        """Return settings sending every request through one chain."""
+        if not self.options['full_middleware']:
+            return {}
+        return {'PREFIX_MIDDLEWARE': [('', settings.FULL_MIDDLEWARE)]}
+
+    def _scenarios(self):
+        """Return the (name, callable) pairs for every benchmarked endpoint."""
+        recipe_url = reverse('recipe:recipe-list')
+        image = _jpeg_bytes()
+
+        def detail_url(recipe_id):
+            return reverse('recipe:recipe-detail', args=[recipe_id])
+
+        def auth(user):
+            return {'HTTP_AUTHORIZATION': f'Token {user["token"]}'}
+
+        def pick(rng, ids):
+            return ids[rng.randrange(len(ids))] if ids else 0
+
+        def recipe_list(client, user, rng):
+            return client.get(recipe_url, **auth(user))
+
+        def recipe_list_sideloaded(client, user, rng):
+            return client.get(recipe_url, {'sideload': 1}, **auth(user))
+
+        def recipe_list_columnar(client, user, rng):
+            return client.get(
+                recipe_url,
+                HTTP_ACCEPT='application/vnd.recipe.columnar+json',
+                **auth(user)
+            )
+
+        def recipe_list_filtered(client, user, rng):
+            params = {
+                'tags': ','.join(
+                    str(pick(rng, user['tags'])) for _ in range(2)
+                ),
+                'ingredients': str(pick(rng, user['ingredients'])),
+            }
+            return client.get(recipe_url, params, **auth(user))
+
+        def recipe_detail(client, user, rng):
+            return client.get(
+                detail_url(pick(rng, user['recipes'])), **auth(user)
+            )
+
+        def recipe_create(client, user, rng):
+            payload = {
+                'title': 'bench create',
+                'time_minutes': rng.randint(5, 240),
+                'price': '9.99',
+                'tags': [{'name': f'tag {rng.randrange(50)}'}],
+                'ingredients': [
+                    {'name': f'ingredient {rng.randrange(50)}'}
+                    for _ in range(3)
+                ],
+            }
+            return client.post(
+                recipe_url, payload, format='json', **auth(user)
+            )
+
+        def recipe_update(client, user, rng):
+            payload = {'title': f'bench update {rng.randrange(1000)}'}
+            return client.patch(
+                detail_url(pick(rng, user['recipes'])), payload,
+                format='json', **auth(user)
+            )
+
+        def recipe_upload_image(client, user, rng):
+            url = reverse(
+                'recipe:recipe-upload-image',
+                args=[pick(rng, user['recipes'])],
+            )
+            upload = SimpleUploadedFile(
+                'bench.jpg', image, content_type='image/jpeg'
+            )
+            return client.post(
+                url, {'image': upload}, format='multipart', **auth(user)
+            )
+
+        def tag_list(client, user, rng):
+            return client.get(reverse('recipe:tag-list'), **auth(user))
+
+        def ingredient_list(client, user, rng):
+            return client.get(
+                reverse('recipe:ingredient-list'), {'assigned_only': 1},
+                **auth(user)
+            )
+
+        def user_me(client, user, rng):
+            return client.get(reverse('user:me'), **auth(user))
+
+        def user_token(client, user, rng):
+            return client.post(
+                reverse('user:token'),
+                {'email': user['email'], 'password': BENCH_PASSWORD},
+            )
+
+        return [
+            ('recipe_list', recipe_list),
+            ('recipe_list_sideloaded', recipe_list_sideloaded),
+            ('recipe_list_columnar', recipe_list_columnar),
+            ('recipe_list_filtered', recipe_list_filtered),
+            ('recipe_detail', recipe_detail),
+            ('recipe_create', recipe_create),
+            ('recipe_update', recipe_update),
+            ('recipe_upload_image', recipe_upload_image),
+            ('tag_list', tag_list),
+            ('ingredient_list', ingredient_list),
+            ('user_me', user_me),
+            ('user_token', user_token),
+        ]
+
+    def _run(self, name, scenario, level):
+        """Drive one scenario with `level` worker threads."""
+        total = self.options['requests']
+        # Per-request seeds are drawn up front so a run is reproducible
+        # regardless of how the threads interleave.
+        plan = [
+            (self.rng.randrange(len(self.dataset)), self.rng.getrandbits(32))
+            for _ in range(total)
+        ]
+        latencies = []
+        errors = []
+        sizes = []
+        lock = threading.Lock()
+
+        def worker(chunk):
+            client = APIClient()
+            local_latencies = []
+            local_sizes = []
+            local_errors = 0
+            try:
+                for user_index, request_seed in chunk:
+                    rng = random.Random(request_seed)
+                    user = self.dataset[user_index]
+                    started = time.perf_counter()
+                    res = scenario(client, user, rng)
+                    # Streaming responses are only complete once consumed.
+                    body = (
+                        b''.join(res.streaming_content) if res.streaming
+                        else res.content
+                    )
+                    local_latencies.append(time.perf_counter() - started)
+                    local_sizes.append(len(body))
+                    if res.status_code >= 400:
+                        local_errors += 1
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                sizes.extend(local_sizes)
+                errors.append(local_errors)
+
+        threads = [
+            threading.Thread(target=worker, args=(plan[i::level],))
+            for i in range(level)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'endpoint': name,
+            'concurrency': level,
+            'requests': len(latencies),
+            'errors': sum(errors),
+            'seconds': round(elapsed, 4),
+            'throughput_rps': round(len(latencies) / elapsed, 2)
+            if elapsed else 0.0,
+            'mean_ms': round(statistics.mean(latencies) * 1000, 3)
+            if latencies else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'mean_bytes': round(statistics.mean(sizes)) if sizes else 0,
+        }
+
+    def _report(self, result):
+        """Write a one-line summary of a scenario result."""
+        self.stdout.write(
+            f"{result['endpoint']:<22} c={result['concurrency']:<3} "
+            f"{result['throughput_rps']:>9.1f} req/s  "
+            f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms "
+            f"p99={result['p99_ms']:.1f}ms {result['mean_bytes']}B "
+            f"errors={result['errors']}"
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.models import UserDeletion
+from core.purge import purge_user
+
+
+class Command(BaseCommand):
+    """Django command to purge the data of users queued for deletion"""
+
+    help = 'Delete queued users and their data in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pending = list(UserDeletion.objects.filter(
+            finished_at__isnull=True, user__isnull=False
+        ))
+        for deletion in pending:
+            self.stdout.write(
+                f'Purging {deletion.email} '
+                f'({deletion.progress:.0%} done)...'
+            )
+            purge_user(deletion, batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Purged {len(pending)} users')
+        )
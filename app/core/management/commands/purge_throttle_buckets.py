@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.throttling import purge_buckets
+
+
+class Command(BaseCommand):
+    """Django command to drop rate limit buckets that have refilled"""
+
+    help = 'Delete full token buckets; they behave like missing ones.'
+
+    def handle(self, *args, **options):
+        deleted = purge_buckets()
+        self.stdout.write(
+            self.style.SUCCESS(f'Purged {deleted} throttle buckets')
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import recompute_stats
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the per-user statistics from scratch"""
+
+    help = 'Recompute UserStats rows to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='Only recompute this user id (may be repeated).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recomputing user statistics...')
+        written = recompute_stats(
+            options['users'], batch_size=options['batch_size']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Recomputed statistics for {written} users')
+        )
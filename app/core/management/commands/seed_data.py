@@ -0,0 +1,431 @@
+"""
+Django command to generate large synthetic datasets for capacity planning.
+"""
+import bisect
+import io
+import math
+import multiprocessing
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from core.models import Recipe, Tag, Ingredient, UserStats, Change
+
+TAG_WORDS = [
+    'vegan', 'vegetarian', 'dessert', 'breakfast', 'brunch', 'lunch',
+    'dinner', 'snack', 'quick', 'healthy', 'spicy', 'sweet', 'gluten free',
+    'dairy free', 'low carb', 'keto', 'comfort food', 'party', 'summer',
+    'winter', 'baking', 'grill', 'one pot', 'kids', 'budget',
+]
+INGREDIENT_WORDS = [
+    'flour', 'sugar', 'salt', 'butter', 'egg', 'milk', 'olive oil',
+    'garlic', 'onion', 'tomato', 'potato', 'carrot', 'rice', 'pasta',
+    'chicken', 'beef', 'cheese', 'basil', 'pepper', 'lemon', 'apple',
+    'banana', 'yeast', 'cream', 'honey', 'chili', 'ginger', 'spinach',
+]
+MEASUREMENTS = ['g', 'kg', 'ml', 'l', 'tsp', 'tbsp', 'cup', 'pcs']
+DISHES = [
+    'stew', 'salad', 'soup', 'cake', 'pie', 'curry', 'bowl', 'tart',
+    'risotto', 'bake', 'stir fry', 'sandwich', 'pancakes', 'skillet',
+]
+
+# Large prime used to derive independent per-user random streams.
+STREAM_STRIDE = 1_000_000_007
+
+
+def user_rng(seed, index):
+    """Return the random stream for user `index`, independent of workers."""
+    return random.Random(seed * STREAM_STRIDE + index)
+
+
+def pareto_count(rng, mean, alpha, maximum):
+    """Draw a power-law distributed count with the given mean."""
+    scale = mean * (alpha - 1) / alpha
+    value = scale * (1.0 - rng.random()) ** (-1.0 / alpha)
+    return max(1, min(int(value), maximum))
+
+
+class ZipfSampler:
+    """Sample ranks 0..n-1 with probability proportional to 1 / (k+1)^s."""
+
+    def __init__(self, n, exponent):
+        self.n = n
+        self.cumulative = []
+        total = 0.0
+        for rank in range(1, n + 1):
+            total += 1.0 / rank ** exponent
+            self.cumulative.append(total)
+
+    def sample(self, rng, k):
+        """Return `k` distinct ranks, popular ranks first more often."""
+        k = min(k, self.n)
+        picked = []
+        seen = set()
+        attempts = 0
+        total = self.cumulative[-1] if self.cumulative else 0.0
+        while len(picked) < k and attempts < k * 20:
+            attempts += 1
+            rank = bisect.bisect_left(self.cumulative, rng.random() * total)
+            if rank not in seen:
+                seen.add(rank)
+                picked.append(rank)
+        # Fall back to the most popular unused ranks if sampling stalls.
+        rank = 0
+        while len(picked) < k:
+            if rank not in seen:
+                seen.add(rank)
+                picked.append(rank)
+            rank += 1
+        return picked
+
+
+def vocabulary_name(words, index):
+    """Return a deterministic, per-user unique name for vocabulary slot."""
+    word = words[index % len(words)]
+    cycle = index // len(words)
+    return f'{word} {cycle}' if cycle else word
+
+
+def _copy_value(value):
+    """Format a Python value for PostgreSQL's COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+class RowWriter:
+    """Buffer rows per model and flush them in chunks, parents first."""
+
+    def __init__(self, models, chunk_size):
+        self.models = models
+        self.chunk_size = chunk_size
+        self.rows = {model: [] for model in models}
+        self.pending = 0
+        self.written = {model._meta.db_table: 0 for model in models}
+
+    def add(self, model, row):
+        """Queue a row (a dict keyed by column name) for `model`."""
+        self.rows[model].append(row)
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row in a single transaction."""
+        if not self.pending:
+            return
+        with transaction.atomic():
+            for model in self.models:
+                rows = self.rows[model]
+                if rows:
+                    self._write(model, rows)
+                    self.written[model._meta.db_table] += len(rows)
+                    self.rows[model] = []
+        self.pending = 0
+
+    def _write(self, model, rows):
+        columns = list(rows[0])
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write('\t'.join(_copy_value(row[c]) for c in columns))
+                buffer.write('\n')
+            buffer.seek(0)
+            quoted = ', '.join(connection.ops.quote_name(c) for c in columns)
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f'COPY {connection.ops.quote_name(model._meta.db_table)}'
+                    f' ({quoted}) FROM STDIN',
+                    buffer,
+                )
+        else:
+            attnames = {
+                field.column: field.attname
+                for field in model._meta.concrete_fields
+            }
+            model.objects.bulk_create(
+                [
+                    model(**{attnames[c]: row[c] for c in columns})
+                    for row in rows
+                ],
+                batch_size=self.chunk_size,
+            )
+
+
+def reserve_ids(model, count):
+    """Reserve `count` consecutive primary keys and return the first one."""
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                'nextval(pg_get_serial_sequence(%s, %s)) + %s - 1)',
+                [table, 'id', table, 'id', max(count, 1)],
+            )
+            last = cursor.fetchone()[0]
+        return last - max(count, 1) + 1
+    last = model.objects.order_by('-id').values_list('id', flat=True).first()
+    return (last or 0) + 1
+
+
+def add_change(writer, user_id, model, object_id):
+    """Queue the first change of a generated object for delta sync."""
+    writer.add(Change, {
+        'user_id': user_id,
+        'model': model,
+        'object_id': object_id,
+        'created_id': None,
+        'deleted': False,
+    })
+
+
+def generate_users(task):
+    """Generate every row belonging to a contiguous range of users."""
+    opts = task['options']
+    User = get_user_model()
+    recipe_tags = Recipe.tags.through
+    recipe_ingredients = Recipe.ingredients.through
+    writer = RowWriter(
+        [
+            User, UserStats, Tag, Ingredient, Recipe,
+            recipe_tags, recipe_ingredients, Change,
+        ],
+        opts['chunk_size'],
+    )
+    tag_sampler = ZipfSampler(opts['tags'], opts['zipf'])
+    ingredient_sampler = ZipfSampler(opts['ingredients'], opts['zipf'])
+    recipe_id = task['first_recipe_id']
+
+    for index in range(task['start'], task['end']):
+        rng = user_rng(opts['seed'], index)
+        recipe_count = pareto_count(
+            rng, opts['recipes_mean'], opts['alpha'], opts['recipes_max']
+        )
+        user_id = task['first_user_id'] + index
+        tag_base = task['first_tag_id'] + index * opts['tags']
+        ingredient_base = (
+            task['first_ingredient_id'] + index * opts['ingredients']
+        )
+
+        writer.add(User, {
+            'id': user_id,
+            'password': task['password'],
+            'last_login': None,
+            'is_superuser': False,
+            'email': f'{opts["email_prefix"]}{index}@example.com',
+            'name': f'Seed User {index}',
+            'is_active': True,
+            'is_staff': False,
+            'token_version': 0,
+        })
+        for slot in range(opts['tags']):
+            writer.add(Tag, {
+                'id': tag_base + slot,
+                'name': vocabulary_name(TAG_WORDS, slot),
+                'user_id': user_id,
+            })
+            add_change(writer, user_id, Change.TAG, tag_base + slot)
+        for slot in range(opts['ingredients']):
+            writer.add(Ingredient, {
+                'id': ingredient_base + slot,
+                'name': vocabulary_name(INGREDIENT_WORDS, slot),
+                'user_id': user_id,
+            })
+            add_change(
+                writer, user_id, Change.INGREDIENT, ingredient_base + slot
+            )
+        prices = []
+        time_total = 0
+        for _ in range(recipe_count):
+            recipe = {
+                'id': recipe_id,
+                'user_id': user_id,
+                'title': (
+                    f'{rng.choice(TAG_WORDS)} {rng.choice(DISHES)}'
+                ).capitalize(),
+                'description': 'A synthetic recipe. ' * rng.randint(1, 30),
+                'time_minutes': max(1, min(
+                    int(rng.lognormvariate(3.4, 0.6)), 600
+                )),
+                'price': Decimal(max(50, min(
+                    int(rng.lognormvariate(7.0, 0.8)), 99999
+                ))) / 100,
+                'link': '',
+                'image': None,
+                'is_public': rng.random() < opts['public_share'],
+            }
+            writer.add(Recipe, recipe)
+            add_change(writer, user_id, Change.RECIPE, recipe_id)
+            prices.append(recipe['price'])
+            time_total += recipe['time_minutes']
+            for slot in tag_sampler.sample(rng, opts['tags_per_recipe']):
+                writer.add(recipe_tags, {
+                    'recipe_id': recipe_id, 'tag_id': tag_base + slot,
+                })
+            for slot in ingredient_sampler.sample(
+                rng, opts['ingredients_per_recipe']
+            ):
+                writer.add(recipe_ingredients, {
+                    'recipe_id': recipe_id,
+                    'ingredient_id': ingredient_base + slot,
+                    'quantity': rng.randint(1, 1000),
+                    'measurement': rng.choice(MEASUREMENTS),
+                })
+            recipe_id += 1
+
+        writer.add(UserStats, {
+            'user_id': user_id,
+            'recipe_count': recipe_count,
+            'tag_count': opts['tags'],
+            'ingredient_count': opts['ingredients'],
+            'time_minutes_total': time_total,
+            'price_min': min(prices),
+            'price_max': max(prices),
+        })
+
+    writer.flush()
+    return task['end'] - task['start'], writer.written
+
+
+def generate_users_in_worker(task):
+    """Run `generate_users` in a pool process and release its connection."""
+    try:
+        return generate_users(task)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """Django command to bulk generate deterministic synthetic data"""
+
+    help = (
+        'Generate users, recipes, tags and ingredients with power-law '
+        'recipes per user and Zipfian tag/ingredient reuse.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes-mean', type=float, default=20.0)
+        parser.add_argument('--recipes-max', type=int, default=10000)
+        parser.add_argument(
+            '--alpha', type=float, default=2.0,
+            help='Pareto shape of the recipes-per-user distribution (> 1).',
+        )
+        parser.add_argument(
+            '--tags', type=int, default=50, help='Tag vocabulary per user.',
+        )
+        parser.add_argument(
+            '--ingredients', type=int, default=200,
+            help='Ingredient vocabulary per user.',
+        )
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Zipf exponent for tag and ingredient reuse.',
+        )
+        parser.add_argument(
+            '--public-share', type=float, default=0.05,
+            help='Fraction of recipes listed in the public feed.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument(
+            '--chunk-size', type=int, default=50000,
+            help='Rows buffered before each COPY/bulk insert.',
+        )
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--email-prefix', default='seed-')
+
+    def handle(self, *args, **options):
+        if options['alpha'] <= 1:
+            raise CommandError('--alpha must be greater than 1.')
+        if options['users'] < 1 or options['workers'] < 1:
+            raise CommandError('--users and --workers must be positive.')
+        if options['tags'] < 1 or options['ingredients'] < 1:
+            raise CommandError('--tags and --ingredients must be positive.')
+
+        users = options['users']
+        recipe_counts = [
+            pareto_count(
+                user_rng(options['seed'], index), options['recipes_mean'],
+                options['alpha'], options['recipes_max'],
+            )
+            for index in range(users)
+        ]
+        total_recipes = sum(recipe_counts)
+        self.stdout.write(
+            f'Generating {users} users and {total_recipes} recipes...'
+        )
+
+        first_user_id = reserve_ids(get_user_model(), users)
+        first_tag_id = reserve_ids(Tag, users * options['tags'])
+        first_ingredient_id = reserve_ids(
+            Ingredient, users * options['ingredients']
+        )
+        first_recipe_id = reserve_ids(Recipe, total_recipes)
+        # Hashing is the dominant cost of create_user, so every seeded
+        # user shares one precomputed hash.
+        password = make_password(options['password'])
+
+        # Only plain values are sent to the worker processes.
+        task_options = {
+            key: options[key] for key in (
+                'seed', 'recipes_mean', 'alpha', 'recipes_max', 'tags',
+                'ingredients', 'tags_per_recipe', 'ingredients_per_recipe',
+                'zipf', 'chunk_size', 'email_prefix', 'public_share',
+            )
+        }
+        tasks = []
+        span = max(1, math.ceil(users / (options['workers'] * 4)))
+        recipe_offset = first_recipe_id
+        for start in range(0, users, span):
+            end = min(start + span, users)
+            tasks.append({
+                'options': task_options,
+                'start': start,
+                'end': end,
+                'password': password,
+                'first_user_id': first_user_id,
+                'first_tag_id': first_tag_id,
+                'first_ingredient_id': first_ingredient_id,
+                'first_recipe_id': recipe_offset,
+            })
+            recipe_offset += sum(recipe_counts[start:end])
+
+        totals = {}
+        done = 0
+        if options['workers'] == 1:
+            for result in map(generate_users, tasks):
+                done = self._progress(result, done, users, totals)
+        else:
+            # Children must open their own connections.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(options['workers']) as pool:
+                for result in pool.imap_unordered(
+                    generate_users_in_worker, tasks
+                ):
+                    done = self._progress(result, done, users, totals)
+
+        for table, count in totals.items():
+            self.stdout.write(f'{table}: {count} rows')
+        self.stdout.write(self.style.SUCCESS('Seeding complete!'))
+
+    def _progress(self, result, done, users, totals):
+        """Accumulate a finished task and report progress."""
+        count, written = result
+        for table, rows in written.items():
+            totals[table] = totals.get(table, 0) + rows
+        done += count
+        self.stdout.write(f'{done}/{users} users written')
+        return done
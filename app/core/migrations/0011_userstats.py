@@ -0,0 +1,73 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:32
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def backfill_user_stats(apps, schema_editor):
+    """Create a statistics row for every existing user, in batches."""
+    User = apps.get_model('core', 'User')
+    UserStats = apps.get_model('core', 'UserStats')
+    Recipe = apps.get_model('core', 'Recipe')
+    Tag = apps.get_model('core', 'Tag')
+    Ingredient = apps.get_model('core', 'Ingredient')
+
+    last_id = 0
+    while True:
+        batch = list(
+            User.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', flat=True)[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_id = batch[-1]
+        stats = {user_id: UserStats(user_id=user_id) for user_id in batch}
+        recipes = Recipe.objects.filter(
+            user_id__in=batch
+        ).order_by().values('user_id').annotate(
+            count=Count('id'), time_total=Sum('time_minutes'),
+            low=Min('price'), high=Max('price'),
+        )
+        for row in recipes:
+            entry = stats[row['user_id']]
+            entry.recipe_count = row['count']
+            entry.time_minutes_total = row['time_total'] or 0
+            entry.price_min = row['low']
+            entry.price_max = row['high']
+        for model, field in (
+            (Tag, 'tag_count'), (Ingredient, 'ingredient_count')
+        ):
+            rows = model.objects.filter(
+                user_id__in=batch
+            ).order_by().values('user_id').annotate(count=Count('id'))
+            for row in rows:
+                setattr(stats[row['user_id']], field, row['count'])
+        UserStats.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.user')),
+                ('recipe_count', models.IntegerField(default=0)),
+                ('tag_count', models.IntegerField(default=0)),
+                ('ingredient_count', models.IntegerField(default=0)),
+                ('time_minutes_total', models.BigIntegerField(default=0)),
+                ('price_min', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('price_max', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+            ],
+        ),
+        migrations.RunPython(
+            backfill_user_stats, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,121 @@
+from django.db import migrations, transaction
+from django.db.models import Count, OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def copy_quantities(apps, schema_editor):
+    """Copy quantity and measurement from each ingredient to its uses."""
+    Ingredient = apps.get_model('core', 'Ingredient')
+    RecipeIngredient = apps.get_model('core', 'RecipeIngredient')
+    ingredient = Ingredient.objects.filter(pk=OuterRef('ingredient_id'))
+
+    last_id = 0
+    while True:
+        ids = list(
+            RecipeIngredient.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            return
+        last_id = ids[-1]
+        with transaction.atomic():
+            RecipeIngredient.objects.filter(
+                id__gte=ids[0], id__lte=last_id
+            ).update(
+                quantity=Subquery(ingredient.values('quantity')[:1]),
+                measurement=Subquery(ingredient.values('measurement')[:1]),
+            )
+
+
+def _merge(connection, through_table, ingredient_table, mapping):
+    """Point uses of duplicate ingredients at the kept ingredient."""
+    values = ', '.join(['(%s, %s)'] * len(mapping))
+    params = [value for pair in mapping for value in pair]
+    with connection.cursor() as cursor:
+        # A recipe using several rows of the same group keeps the one
+        # with the lowest ingredient id.
+        cursor.execute(
+            f'WITH mapping(dup, keep) AS (VALUES {values}) '
+            f'DELETE FROM {through_table} ri USING mapping m '
+            f'WHERE ri.ingredient_id = m.dup AND EXISTS ('
+            f'  SELECT 1 FROM {through_table} other '
+            f'  LEFT JOIN mapping m2 ON m2.dup = other.ingredient_id '
+            f'  WHERE other.recipe_id = ri.recipe_id '
+            f'  AND COALESCE(m2.keep, other.ingredient_id) = m.keep '
+            f'  AND other.ingredient_id < ri.ingredient_id)',
+            params,
+        )
+        cursor.execute(
+            f'WITH mapping(dup, keep) AS (VALUES {values}) '
+            f'UPDATE {through_table} ri SET ingredient_id = m.keep '
+            f'FROM mapping m WHERE ri.ingredient_id = m.dup',
+            params,
+        )
+        cursor.execute(
+            f'DELETE FROM {ingredient_table} WHERE id IN '
+            f'({", ".join(["%s"] * len(mapping))})',
+            [dup for dup, _ in mapping],
+        )
+
+
+def _recount(Ingredient, UserStats, user_ids):
+    """Recompute the ingredient counts 0011 stored for `user_ids`."""
+    counts = Ingredient.objects.filter(
+        user_id=OuterRef('user_id')
+    ).order_by().values('user_id').annotate(count=Count('id'))
+    UserStats.objects.filter(user_id__in=user_ids).update(
+        ingredient_count=Subquery(counts.values('count')[:1]),
+    )
+
+
+def collapse_duplicates(apps, schema_editor):
+    """Merge ingredients sharing a user and name into the oldest one."""
+    Ingredient = apps.get_model('core', 'Ingredient')
+    RecipeIngredient = apps.get_model('core', 'RecipeIngredient')
+    UserStats = apps.get_model('core', 'UserStats')
+    connection = schema_editor.connection
+    through_table = connection.ops.quote_name(
+        RecipeIngredient._meta.db_table
+    )
+    ingredient_table = connection.ops.quote_name(Ingredient._meta.db_table)
+
+    rows = Ingredient.objects.order_by('user_id', 'name', 'id').values_list(
+        'id', 'user_id', 'name'
+    ).iterator(chunk_size=BATCH_SIZE)
+    mapping = []
+    user_ids = set()
+    key = keep = None
+    for ingredient_id, user_id, name in rows:
+        if (user_id, name) != key:
+            # Only flush between groups so a group is merged at once.
+            if len(mapping) >= BATCH_SIZE:
+                with transaction.atomic():
+                    _merge(connection, through_table, ingredient_table,
+                           mapping)
+                    _recount(Ingredient, UserStats, user_ids)
+                mapping = []
+                user_ids = set()
+            key, keep = (user_id, name), ingredient_id
+        else:
+            mapping.append((ingredient_id, keep))
+            user_ids.add(user_id)
+    if mapping:
+        with transaction.atomic():
+            _merge(connection, through_table, ingredient_table, mapping)
+            _recount(Ingredient, UserStats, user_ids)
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so large tables are never locked by
+    # one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0012_recipe_ingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_quantities, migrations.RunPython.noop),
+        migrations.RunPython(collapse_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_collapse_duplicate_ingredients'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='ingredient',
+            name='measurement',
+        ),
+        migrations.RemoveField(
+            model_name='ingredient',
+            name='quantity',
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_user_ingredient'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_remove_ingredient_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.FloatField()),
+                ('expires_at', models.FloatField(db_index=True)),
+                ('allowed', models.BooleanField(default=True)),
+            ],
+        ),
+        # Bucket state is disposable, so skip the write-ahead log.
+        migrations.RunSQL(
+            'ALTER TABLE core_throttlebucket SET UNLOGGED',
+            'ALTER TABLE core_throttlebucket SET LOGGED',
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-19 07:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Give every existing object a first change so a full sync returns it.
+BACKFILL_SQL = """
+    INSERT INTO core_change (id, created_id, user_id, model, object_id, deleted)
+    SELECT s.seq, s.seq, s.user_id, '{model}', s.id, false FROM (
+        SELECT nextval(pg_get_serial_sequence('core_change', 'id')) AS seq,
+               id, user_id
+        FROM core_{model} ORDER BY id
+    ) s
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('recipe', 'Recipe'), ('tag', 'Tag'), ('ingredient', 'Ingredient')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('created_id', models.BigIntegerField(null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['user', 'id'], name='core_change_user_id_dfd788_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='change',
+            constraint=models.UniqueConstraint(fields=('model', 'object_id'), name='unique_change_object'),
+        ),
+        migrations.RunSQL(
+            [BACKFILL_SQL.format(model=model) for model in (
+                'recipe', 'tag', 'ingredient',
+            )],
+            migrations.RunSQL.noop,
+        ),
+    ]
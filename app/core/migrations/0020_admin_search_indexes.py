@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:21
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes to the large tables.
+    atomic = False
+
+    dependencies = [
+        ('core', '0019_signed_tokens'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ingredient',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='core_ingredient_name_upper'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(django.db.models.functions.text.Upper('title'), name='core_recipe_title_upper'),
+        ),
+        AddIndexConcurrently(
+            model_name='tag',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='core_tag_name_upper'),
+        ),
+    ]
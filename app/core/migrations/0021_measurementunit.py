@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:29
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# name: (base unit, factor); measurements missing here are summed as is.
+UNITS = {
+    'mg': ('g', '0.001'),
+    'g': ('g', '1'),
+    'gram': ('g', '1'),
+    'grams': ('g', '1'),
+    'kg': ('g', '1000'),
+    'oz': ('g', '28.349523'),
+    'lb': ('g', '453.59237'),
+    'ml': ('ml', '1'),
+    'cl': ('ml', '10'),
+    'dl': ('ml', '100'),
+    'l': ('ml', '1000'),
+    'tsp': ('ml', '4.928922'),
+    'tbsp': ('ml', '14.786765'),
+    'fl oz': ('ml', '29.573530'),
+    'cup': ('ml', '236.588237'),
+    'pc': ('pcs', '1'),
+    'pcs': ('pcs', '1'),
+    'piece': ('pcs', '1'),
+    'pieces': ('pcs', '1'),
+}
+
+
+def add_units(apps, schema_editor):
+    MeasurementUnit = apps.get_model('core', 'MeasurementUnit')
+    MeasurementUnit.objects.bulk_create([
+        MeasurementUnit(name=name, base=base, factor=Decimal(factor))
+        for name, (base, factor) in UNITS.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementUnit',
+            fields=[
+                ('name', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('base', models.CharField(max_length=20)),
+                ('factor', models.DecimalField(decimal_places=6, max_digits=12)),
+            ],
+            options={
+                'ordering': ['base', 'factor'],
+            },
+        ),
+        migrations.RunPython(add_units, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:34
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the index without blocking writes to the recipe table.
+    atomic = False
+
+    dependencies = [
+        ('core', '0022_recipe_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='is_public',
+            field=models.BooleanField(default=False),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-id'], name='core_recipe_public_feed'),
+        ),
+    ]
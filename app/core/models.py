@@ -2,12 +2,14 @@ import os
 import uuid
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import (
     AbstractBaseUser, BaseUserManager, PermissionsMixin
 )
 from django.conf import settings
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 
 
 def recipe_image_file_path(instance, filename):
@@ -55,6 +57,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped to revoke every signed access token issued so far.
+    token_version = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
@@ -75,16 +79,46 @@ class Recipe(models.Model):
     link = models.URLField(max_length=255, blank=True)
     tags = models.ManyToManyField('Tag', blank=True, related_name='recipes')
     ingredients = models.ManyToManyField(
-        'Ingredient', blank=True, related_name='recipes'
+        'Ingredient', blank=True, related_name='recipes',
+        through='RecipeIngredient'
     )
     image = models.ImageField(upload_to=recipe_image_file_path, null=True)
+    # Public recipes are listed in the feed shared by all users.
+    is_public = models.BooleanField(default=False)
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            # Serves case-insensitive exact title searches in the admin.
+            models.Index(Upper('title'), name='core_recipe_title_upper'),
+            # Serve each ordering of the recipe list, filtered or not.
+            models.Index(fields=['user', 'id'], name='core_recipe_user_id'),
+            models.Index(
+                fields=['user', 'title', 'id'], name='core_recipe_user_title',
+            ),
+            models.Index(
+                fields=['user', 'price', 'id'], name='core_recipe_user_price',
+            ),
+            models.Index(
+                fields=['user', 'time_minutes', 'id'],
+                name='core_recipe_user_time',
+            ),
+            models.Index(
+                fields=['-id'], condition=models.Q(is_public=True),
+                name='core_recipe_public_feed',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded values so updates can be applied as deltas."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Tag(models.Model):
     """Tag object"""
@@ -97,6 +131,7 @@ class Tag(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [models.Index(Upper('name'), name='core_tag_name_upper')]
 
     def __str__(self):
         return self.name
@@ -110,11 +145,206 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE,
         related_name='ingredients'
         )
-    quantity = models.IntegerField(null=True, blank=True)
-    measurement = models.CharField(max_length=20, blank=True, null=True)
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'], name='unique_user_ingredient'
+            ),
+        ]
+        indexes = [
+            models.Index(Upper('name'), name='core_ingredient_name_upper'),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class RecipeIngredient(models.Model):
+    """Ingredient of a recipe, with the quantity used in that recipe"""
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='recipe_ingredients'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='recipe_ingredients'
+    )
+    quantity = models.IntegerField(null=True, blank=True)
+    measurement = models.CharField(max_length=20, blank=True, null=True)
+
+    class Meta:
+        # Reuses the table of the former auto-created many-to-many.
+        db_table = 'core_recipe_ingredients'
+        ordering = ['ingredient__name']
+        unique_together = [['recipe', 'ingredient']]
+
+    def __str__(self):
+        return f'{self.quantity or ""} {self.measurement or ""} ' \
+            f'{self.ingredient}'.strip()
+
+
+class MeasurementUnit(models.Model):
+    """Conversion of a measurement to the base unit it is summed in"""
+    name = models.CharField(max_length=20, primary_key=True)
+    base = models.CharField(max_length=20)
+    factor = models.DecimalField(max_digits=12, decimal_places=6)
+
+    class Meta:
+        ordering = ['base', 'factor']
+
+    def __str__(self):
+        return f'1 {self.name} = {self.factor.normalize()} {self.base}'
+
+
+class UserStats(models.Model):
+    """Denormalized recipe statistics, maintained incrementally per user"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    recipe_count = models.IntegerField(default=0)
+    tag_count = models.IntegerField(default=0)
+    ingredient_count = models.IntegerField(default=0)
+    time_minutes_total = models.BigIntegerField(default=0)
+    price_min = models.DecimalField(
+        max_digits=5, decimal_places=2, null=True, blank=True
+    )
+    price_max = models.DecimalField(
+        max_digits=5, decimal_places=2, null=True, blank=True
+    )
+
+    def __str__(self):
+        return f'Stats for user {self.user_id}'
+
+    @property
+    def average_time_minutes(self):
+        """Return the average preparation time of the user's recipes."""
+        if not self.recipe_count:
+            return None
+        return self.time_minutes_total / self.recipe_count
+
+
+class ThrottleBucket(models.Model):
+    """Token bucket state shared by every worker process"""
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()
+    # When the bucket will be full again; later rows can be purged.
+    expires_at = models.FloatField(db_index=True)
+    allowed = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.key
+
+
+class IdempotencyKey(models.Model):
+    """First response of a request sent with an `Idempotency-Key` header"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    # Both stay empty while the first request is still running.
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'], name='unique_user_idempotency_key'
+            ),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class Change(models.Model):
+    """
+    Latest change to a synced object.
+
+    `id` is the sync sequence number: every write moves the row to a new
+    value from the table's sequence, so clients fetch `id > cursor`.
+    """
+    RECIPE = 'recipe'
+    TAG = 'tag'
+    INGREDIENT = 'ingredient'
+    MODEL_CHOICES = [
+        (RECIPE, 'Recipe'), (TAG, 'Tag'), (INGREDIENT, 'Ingredient'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    # Sequence number of the object's first change, if known.
+    created_id = models.BigIntegerField(null=True)
+    deleted = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model', 'object_id'], name='unique_change_object'
+            ),
+        ]
+        indexes = [models.Index(fields=['user', 'id'])]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
+
+
+class UserDeletion(models.Model):
+    """A deactivated user whose data is being purged in the background"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='deletion',
+    )
+    email = models.EmailField(max_length=255)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Recipes, tags and ingredients, counted from the user's stats.
+    total_objects = models.BigIntegerField(default=0)
+    deleted_objects = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['requested_at']
+
+    def __str__(self):
+        return self.email
+
+    @property
+    def progress(self):
+        """Fraction of the user's objects purged so far."""
+        if self.finished_at is not None:
+            return 1.0
+        if not self.total_objects:
+            return 0.0
+        return min(self.deleted_objects / self.total_objects, 1.0)
+
+
+class RefreshToken(models.Model):
+    """Long-lived token exchanged for new signed access tokens"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='refresh_tokens',
+    )
+    # Only a hash is stored, so a database leak exposes no usable tokens.
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'Refresh token for {self.user_id}'
@@ -0,0 +1,148 @@
+"""
+Paginators that avoid exact COUNT(*) queries on huge tables.
+"""
+import json
+from collections import OrderedDict
+
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def table_estimate(model, using='default'):
+    """Return the planner's row estimate for `model`'s table, or None."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # Tables that were never analyzed report -1 (or 0 before PG 14).
+    if row is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+def query_estimate(queryset):
+    """Return the planner's row estimate for `queryset`, or None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    # Ordering does not change the row count but can change the plan.
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset):
+    """
+    Return a cheap row estimate for `queryset`, or None.
+
+    Unfiltered querysets use the table statistics; filtered ones ask the
+    planner for the estimated size of the result.
+    """
+    query = queryset.query
+    if not query.where and not query.distinct and not query.group_by:
+        return table_estimate(queryset.model, queryset.db)
+    return query_estimate(queryset)
+
+
+class EstimatedPage(Page):
+    """Page that knows whether more rows follow without a total count."""
+    more = None
+
+    def has_next(self):
+        if self.more is None:
+            return super().has_next()
+        return self.more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator reporting planner estimates for lists above `threshold`.
+
+    Lists estimated at or below `threshold` rows are counted exactly, and
+    `count_is_approximate` says which of the two `count` is. Approximate
+    pages may run past the estimated page count; whether another page
+    follows is then found by reading one extra row.
+    """
+    threshold = 100000
+
+    def __init__(self, *args, threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if threshold is not None:
+            self.threshold = threshold
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate > self.threshold:
+                self.count_is_approximate = True
+                return estimate
+        return super().count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Opt-in page number pagination with estimated counts.
+
+    Lists are only paginated when `page_size` is given, so unpaginated
+    clients keep receiving plain lists.
+    """
+    django_paginator_class = EstimatedCountPaginator
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_approximate', paginator.count_is_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_approximate'] = {
+            'type': 'boolean',
+            'description': 'Whether `count` is a planner estimate.',
+        }
+        return response_schema
@@ -0,0 +1,90 @@
+"""
+Background deletion of users and everything they own.
+"""
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.authentication import revoke_tokens
+from core.feed import invalidate_recipes
+from core.models import (
+    Recipe, Tag, Ingredient, RecipeIngredient, Change, IdempotencyKey,
+    UserStats, UserDeletion,
+)
+
+# Models owned through `user`, in deletion order, with the through rows
+# (model, foreign key) that must go before each batch.
+PURGE_STEPS = [
+    (Recipe, [(Recipe.tags.through, 'recipe'), (RecipeIngredient, 'recipe')]),
+    (Tag, [(Recipe.tags.through, 'tag')]),
+    (Ingredient, [(RecipeIngredient, 'ingredient')]),
+    (Change, []),
+    (IdempotencyKey, []),
+]
+COUNTED_MODELS = (Recipe, Tag, Ingredient)
+
+
+def request_user_deletion(user):
+    """Deactivate `user` now and queue their data for purging."""
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        revoke_tokens(user)
+        # Take their recipes out of the public feed right away.
+        public = Recipe.objects.filter(user=user, is_public=True)
+        invalidate_recipes(public.values_list('pk', flat=True))
+        public.update(is_public=False)
+        stats = UserStats.objects.filter(user=user).first()
+        total = 0
+        if stats is not None:
+            total = (
+                stats.recipe_count + stats.tag_count + stats.ingredient_count
+            )
+        deletion, _ = UserDeletion.objects.get_or_create(
+            user=user,
+            defaults={'email': user.email, 'total_objects': total},
+        )
+    return deletion
+
+
+def _delete_rows(model, ids):
+    """Delete rows by primary key without loading them or sending signals.
+
+    Per-object bookkeeping (stats, cache versions, sync tombstones) is
+    pointless for data whose owner is going away.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE id = ANY(%s)', [ids])
+        return cursor.rowcount
+
+
+def purge_user(deletion, batch_size=1000):
+    """Delete the user's data in short batched transactions.
+
+    Safe to interrupt and run again; each batch commits on its own.
+    """
+    user_id = deletion.user_id
+    if user_id is None or deletion.finished_at is not None:
+        return deletion
+    for model, dependents in PURGE_STEPS:
+        queryset = model.objects.filter(user_id=user_id).order_by('pk')
+        while True:
+            ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                for through, field in dependents:
+                    through.objects.filter(**{f'{field}_id__in': ids}).delete()
+                deleted = _delete_rows(model, ids)
+                if model in COUNTED_MODELS:
+                    UserDeletion.objects.filter(pk=deletion.pk).update(
+                        deleted_objects=F('deleted_objects') + deleted
+                    )
+    # Only small rows remain, so the regular cascade is cheap now.
+    with transaction.atomic():
+        deletion.user.delete()
+        deletion.refresh_from_db()
+        deletion.finished_at = timezone.now()
+        deletion.save(update_fields=['finished_at'])
+    return deletion
@@ -0,0 +1,46 @@
+"""
+Shopping lists summing the ingredients of several recipes.
+"""
+from django.db import connection
+
+from core.models import Ingredient, MeasurementUnit, Recipe, RecipeIngredient
+
+
+def shopping_list(user_id, servings):
+    """
+    Return the ingredient totals of the user's recipes in `servings`.
+
+    `servings` maps recipe IDs to how many times each recipe is made.
+    Quantities are converted to the base unit of their measurement and
+    summed per ingredient name and unit in a single query; measurements
+    without a known conversion are summed as they are.
+    """
+    if not servings:
+        return []
+    quote = connection.ops.quote_name
+    recipe_ids, multipliers = zip(*servings.items())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT i.name, COALESCE(u.base, ri.measurement) AS unit, '
+            'ROUND(SUM(ri.quantity * COALESCE(u.factor, 1) * s.servings), 2) '
+            'FROM unnest(%(recipes)s::bigint[], %(servings)s::numeric[]) '
+            'AS s(recipe_id, servings) '
+            f'JOIN {quote(Recipe._meta.db_table)} r '
+            'ON r.id = s.recipe_id AND r.user_id = %(user)s '
+            f'JOIN {quote(RecipeIngredient._meta.db_table)} ri '
+            'ON ri.recipe_id = r.id '
+            f'JOIN {quote(Ingredient._meta.db_table)} i '
+            'ON i.id = ri.ingredient_id '
+            f'LEFT JOIN {quote(MeasurementUnit._meta.db_table)} u '
+            'ON u.name = LOWER(TRIM(ri.measurement)) '
+            'GROUP BY 1, 2 ORDER BY 1, 2',
+            {
+                'user': user_id,
+                'recipes': list(recipe_ids),
+                'servings': list(multipliers),
+            },
+        )
+        return [
+            {'name': name, 'unit': unit, 'quantity': quantity}
+            for name, unit, quantity in cursor.fetchall()
+        ]
@@ -0,0 +1,178 @@
+"""
+Signal handlers keeping derived recipe data in sync with writes.
+"""
+from django.conf import settings
+from django.db.models.signals import (
+    post_save, post_delete, pre_delete, m2m_changed,
+)
+from django.dispatch import receiver
+
+from core import stats
+from core.cache import bump_data_version
+from core.feed import invalidate_recipes
+from core.models import Recipe, Tag, Ingredient, UserStats, Change
+from core.sync import record_changes
+
+SYNC_MODELS = {
+    Recipe: Change.RECIPE,
+    Tag: Change.TAG,
+    Ingredient: Change.INGREDIENT,
+}
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def recipe_data_changed(sender, instance, **kwargs):
+    """Bump the owner's data version on recipe, tag or ingredient writes."""
+    bump_data_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def recipe_relations_changed(sender, instance, action, **kwargs):
+    """Bump the owner's data version when recipe relations change."""
+    if action.startswith('post_'):
+        bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    """Start every new user with an empty statistics row."""
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_user_changes(sender, instance, **kwargs):
+    """Drop tombstones the cascade recorded for a deleted user."""
+    # They are written after the user's changes were collected for
+    # deletion and would fail the foreign key check at commit.
+    Change.objects.filter(user_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Recipe)
+def update_stats_on_recipe_save(sender, instance, created, raw=False,
+                                **kwargs):
+    """Apply recipe inserts and updates to the owner's statistics."""
+    if not raw:
+        stats.recipe_saved(instance, created)
+
+
+@receiver(post_delete, sender=Recipe)
+def update_stats_on_recipe_delete(sender, instance, **kwargs):
+    """Remove deleted recipes from the owner's statistics."""
+    stats.recipe_deleted(instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def update_stats_on_attr_save(sender, instance, created, raw=False,
+                              **kwargs):
+    """Count newly created tags and ingredients."""
+    if created and not raw:
+        field = 'tag_count' if sender is Tag else 'ingredient_count'
+        stats.adjust_stats(instance.user_id, **{field: 1})
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def update_stats_on_attr_delete(sender, instance, **kwargs):
+    """Stop counting deleted tags and ingredients."""
+    field = 'tag_count' if sender is Tag else 'ingredient_count'
+    stats.adjust_stats(instance.user_id, **{field: -1})
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def record_save_change(sender, instance, raw=False, **kwargs):
+    """Move saved objects to the head of the change sequence."""
+    if not raw:
+        record_changes(instance.user_id, SYNC_MODELS[sender], [instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def record_delete_change(sender, instance, **kwargs):
+    """Leave a tombstone for deleted objects, including cascades."""
+    record_changes(
+        instance.user_id, SYNC_MODELS[sender], [instance.pk], deleted=True
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def record_relation_change(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Mark recipes whose tags or ingredients changed as updated."""
+    if not reverse:
+        if action.startswith('post_'):
+            record_changes(instance.user_id, Change.RECIPE, [instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        record_changes(instance.user_id, Change.RECIPE, list(pk_set))
+    elif action == 'pre_clear':
+        record_linked_recipes(type(instance), instance)
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def record_linked_recipes(sender, instance, **kwargs):
+    """Mark recipes losing a tag or ingredient as updated."""
+    record_changes(
+        instance.user_id,
+        Change.RECIPE,
+        list(instance.recipes.values_list('pk', flat=True)),
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def update_public_feed(sender, instance, created, raw=False, **kwargs):
+    """Invalidate the feed pages of recipes published, edited or hidden."""
+    loaded = getattr(instance, '_loaded_values', {})
+    # Recipes saved without their previous state might have been public.
+    was_public = not created and loaded.get('is_public', True)
+    if instance.is_public or was_public:
+        invalidate_recipes([instance.pk])
+    instance._loaded_values = {**loaded, 'is_public': instance.is_public}
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_from_public_feed(sender, instance, **kwargs):
+    """Invalidate the feed pages of deleted public recipes."""
+    if instance.is_public:
+        invalidate_recipes([instance.pk])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_public_feed_relations(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    """Invalidate the feed pages of public recipes whose relations change."""
+    if not reverse:
+        if action.startswith('post_') and instance.is_public:
+            invalidate_recipes([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_recipes(Recipe.objects.filter(
+            pk__in=pk_set, is_public=True
+        ).values_list('pk', flat=True))
+    elif action == 'pre_clear':
+        update_public_feed_attrs(type(instance), instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def update_public_feed_attrs(sender, instance, created=False, raw=False,
+                             **kwargs):
+    """Invalidate the feed pages of public recipes using the object."""
+    if created or raw:
+        return
+    invalidate_recipes(instance.recipes.filter(
+        is_public=True
+    ).values_list('pk', flat=True))
@@ -0,0 +1,143 @@
+"""
+In-memory index ranking a user's recipes by shared tags and ingredients.
+"""
+import heapq
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+
+from core.cache import get_data_version
+from core.models import Recipe
+
+TAG_WEIGHT = 1.0
+INGREDIENT_WEIGHT = 2.0
+
+
+class SimilarityIndex:
+    """
+    Sparse tag and ingredient sets of one user's recipes.
+
+    Each tag and ingredient maps to a posting array of the recipes using
+    it, so the overlap with every other recipe is counted in one pass over
+    the postings of the target's own tags and ingredients.
+    """
+
+    def __init__(self, version, tag_pairs, ingredient_pairs):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.size = 0
+        self.tags, self.tag_postings = self._build(tag_pairs)
+        self.ingredients, self.ingredient_postings = self._build(
+            ingredient_pairs
+        )
+
+    def _build(self, pairs):
+        """Return recipe -> IDs and ID -> recipes arrays for `pairs`."""
+        forward = {}
+        postings = {}
+        for recipe_id, target_id in pairs:
+            forward.setdefault(recipe_id, array('q')).append(target_id)
+            postings.setdefault(target_id, array('q')).append(recipe_id)
+            self.size += 1
+        return forward, postings
+
+    @classmethod
+    def build(cls, user_id, version):
+        """Load the index of `user_id`'s recipes at data `version`."""
+        pairs = []
+        for field, target in (('tags', 'tag_id'), ('ingredients',
+                                                   'ingredient_id')):
+            through = getattr(Recipe, field).through
+            pairs.append(
+                through.objects.filter(
+                    recipe__user_id=user_id
+                ).order_by().values_list('recipe_id', target).iterator()
+            )
+        return cls(version, *pairs)
+
+    def similar(self, recipe_id, limit):
+        """
+        Return up to `limit` (recipe ID, score) pairs, best match first.
+
+        The score is the Jaccard similarity of the recipes' tag and
+        ingredient sets, with each ingredient weighing INGREDIENT_WEIGHT
+        and each tag TAG_WEIGHT.
+        """
+        tags = self.tags.get(recipe_id, ())
+        ingredients = self.ingredients.get(recipe_id, ())
+        shared_tags = Counter()
+        for tag_id in tags:
+            shared_tags.update(self.tag_postings[tag_id])
+        shared_ingredients = Counter()
+        for ingredient_id in ingredients:
+            shared_ingredients.update(self.ingredient_postings[ingredient_id])
+        candidates = shared_tags.keys() | shared_ingredients.keys()
+        candidates.discard(recipe_id)
+
+        scores = []
+        for candidate in candidates:
+            common_tags = shared_tags[candidate]
+            common_ingredients = shared_ingredients[candidate]
+            intersection = (
+                TAG_WEIGHT * common_tags
+                + INGREDIENT_WEIGHT * common_ingredients
+            )
+            union = (
+                TAG_WEIGHT * (
+                    len(tags) + len(self.tags.get(candidate, ()))
+                    - common_tags
+                )
+                + INGREDIENT_WEIGHT * (
+                    len(ingredients)
+                    + len(self.ingredients.get(candidate, ()))
+                    - common_ingredients
+                )
+            )
+            scores.append((intersection / union, candidate))
+        # Ties go to the newest recipe.
+        return [
+            (candidate, score)
+            for score, candidate in heapq.nlargest(limit, scores)
+        ]
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index(user_id):
+    """Return an up to date index of `user_id`'s recipes.
+
+    Indexes are built lazily and dropped once the user's data version
+    moves on, so any write to their recipes, tags or ingredients
+    invalidates it. Without a shared default cache other processes don't
+    see the new version, so indexes are also rebuilt once they are older
+    than `settings.PROCESS_CACHE_TTL` seconds.
+    """
+    version = get_data_version(user_id)
+    ttl = settings.PROCESS_CACHE_TTL
+    with _lock:
+        index = _indexes.get(user_id)
+        if index is not None and index.version == version and not (
+            ttl and time.monotonic() - index.built_at > ttl
+        ):
+            _indexes.move_to_end(user_id)
+            return index
+    index = SimilarityIndex.build(user_id, version)
+    with _lock:
+        _indexes.pop(user_id, None)
+        _indexes[user_id] = index
+        total = sum(entry.size for entry in _indexes.values())
+        while total > settings.SIMILARITY_INDEX_MAX_SIZE and len(_indexes) > 1:
+            _, evicted = _indexes.popitem(last=False)
+            total -= evicted.size
+    return index
+
+
+def clear_indexes():
+    """Drop every index held by this process."""
+    with _lock:
+        _indexes.clear()
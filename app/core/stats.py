@@ -0,0 +1,154 @@
+"""
+Maintenance of the denormalized per-user statistics.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from core.models import Recipe, Tag, Ingredient, UserStats
+
+
+def adjust_stats(user_id, **deltas):
+    """Atomically add `deltas` to the user's counters.
+
+    Returns the number of rows updated, which is 0 when the user has no
+    stats row yet (it is then computed lazily on read).
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    return UserStats.objects.filter(user_id=user_id).update(**changes)
+
+
+def widen_price_range(user_id, price):
+    """Extend the user's price range to include `price`."""
+    return UserStats.objects.filter(user_id=user_id).update(
+        price_min=Least(Coalesce('price_min', Value(price)), Value(price)),
+        price_max=Greatest(Coalesce('price_max', Value(price)), Value(price)),
+    )
+
+
+def refresh_price_range(user_id):
+    """Recompute the user's price range after a boundary price went away."""
+    prices = Recipe.objects.filter(user_id=user_id).aggregate(
+        price_min=Min('price'), price_max=Max('price')
+    )
+    UserStats.objects.filter(user_id=user_id).update(**prices)
+
+
+def recipe_saved(recipe, created):
+    """Apply a recipe insert or update to the owner's statistics."""
+    old = getattr(recipe, '_loaded_values', {})
+    if created:
+        if adjust_stats(
+            recipe.user_id,
+            recipe_count=1,
+            time_minutes_total=recipe.time_minutes,
+        ):
+            widen_price_range(recipe.user_id, recipe.price)
+    elif 'time_minutes' in old and 'price' in old:
+        if old['time_minutes'] != recipe.time_minutes:
+            adjust_stats(
+                recipe.user_id,
+                time_minutes_total=recipe.time_minutes - old['time_minutes'],
+            )
+        if old['price'] != recipe.price:
+            stats = UserStats.objects.filter(user_id=recipe.user_id).first()
+            if stats is not None and old['price'] in (
+                stats.price_min, stats.price_max
+            ):
+                refresh_price_range(recipe.user_id)
+            else:
+                widen_price_range(recipe.user_id, recipe.price)
+    else:
+        # The previous values are unknown, so rebuild this user's row.
+        recompute_stats([recipe.user_id])
+    recipe._loaded_values = {
+        **old, 'time_minutes': recipe.time_minutes, 'price': recipe.price,
+    }
+
+
+def recipe_deleted(recipe):
+    """Remove a deleted recipe from the owner's statistics."""
+    if not adjust_stats(
+        recipe.user_id,
+        recipe_count=-1,
+        time_minutes_total=-recipe.time_minutes,
+    ):
+        return
+    stats = UserStats.objects.filter(user_id=recipe.user_id).first()
+    if stats is not None and recipe.price in (
+        stats.price_min, stats.price_max
+    ):
+        refresh_price_range(recipe.user_id)
+
+
+def compute_stats(user_ids):
+    """Compute statistics from scratch for `user_ids` in grouped queries."""
+    stats = {
+        user_id: UserStats(user_id=user_id) for user_id in user_ids
+    }
+    recipes = Recipe.objects.filter(
+        user_id__in=user_ids
+    ).order_by().values('user_id').annotate(
+        count=Count('id'),
+        time_total=Sum('time_minutes'),
+        low=Min('price'),
+        high=Max('price'),
+    )
+    for row in recipes:
+        entry = stats[row['user_id']]
+        entry.recipe_count = row['count']
+        entry.time_minutes_total = row['time_total'] or 0
+        entry.price_min = row['low']
+        entry.price_max = row['high']
+    for model, field in ((Tag, 'tag_count'), (Ingredient, 'ingredient_count')):
+        rows = model.objects.filter(
+            user_id__in=user_ids
+        ).order_by().values('user_id').annotate(count=Count('id'))
+        for row in rows:
+            setattr(stats[row['user_id']], field, row['count'])
+    return stats
+
+
+def recompute_stats(user_ids=None, batch_size=1000):
+    """Rebuild the statistics rows of `user_ids` (all users by default).
+
+    Returns the number of rows written.
+    """
+    users = get_user_model().objects.order_by('id')
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    fields = [
+        'recipe_count', 'tag_count', 'ingredient_count',
+        'time_minutes_total', 'price_min', 'price_max',
+    ]
+    written = 0
+    last_id = 0
+    while True:
+        batch = list(
+            users.filter(id__gt=last_id).values_list('id', flat=True)[
+                :batch_size
+            ]
+        )
+        if not batch:
+            return written
+        last_id = batch[-1]
+        with transaction.atomic():
+            # Lock existing rows so concurrent increments wait for us.
+            existing = set(
+                UserStats.objects.select_for_update().filter(
+                    user_id__in=batch
+                ).values_list('user_id', flat=True)
+            )
+            stats = compute_stats(batch)
+            UserStats.objects.bulk_update(
+                [stats[user_id] for user_id in existing], fields
+            )
+            UserStats.objects.bulk_create(
+                [
+                    entry for user_id, entry in stats.items()
+                    if user_id not in existing
+                ],
+                ignore_conflicts=True,
+            )
+        written += len(batch)
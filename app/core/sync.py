@@ -0,0 +1,67 @@
+"""
+Change sequence used by the delta sync API.
+"""
+from django.db import connection, transaction
+
+from core.models import Change
+
+
+def _lock(cursor, user_id, shared=False):
+    """Take the user's change lock until the end of the transaction.
+
+    Writers hold it exclusively from drawing a sequence number until it
+    is committed, and readers take it shared, so a reader never sees a
+    number while a smaller one is still uncommitted.
+    """
+    function = 'pg_advisory_xact_lock_shared' if shared \
+        else 'pg_advisory_xact_lock'
+    cursor.execute(f'SELECT {function}(%s)', [user_id])
+
+
+def _write_changes(user_id, model, object_ids, deleted):
+    table = connection.ops.quote_name(Change._meta.db_table)
+    user_table = connection.ops.quote_name(
+        Change._meta.get_field('user').related_model._meta.db_table
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock(cursor, user_id)
+        cursor.execute(
+            f'INSERT INTO {table} AS c '
+            '(id, created_id, user_id, model, object_id, deleted) '
+            'SELECT s.seq, s.seq, %(user)s, %(model)s, s.object_id, '
+            '%(deleted)s FROM ('
+            f"SELECT nextval(pg_get_serial_sequence('{table}', 'id')) "
+            'AS seq, object_id FROM unnest(%(ids)s::bigint[]) AS object_id'
+            ') s '
+            # Objects removed along with their owner need no tombstone.
+            f'WHERE EXISTS (SELECT 1 FROM {user_table} WHERE id = %(user)s) '
+            'ON CONFLICT (model, object_id) DO UPDATE SET '
+            'id = EXCLUDED.id, user_id = EXCLUDED.user_id, '
+            'deleted = EXCLUDED.deleted',
+            {
+                'user': user_id, 'model': model,
+                'ids': sorted(set(object_ids)), 'deleted': deleted,
+            },
+        )
+
+
+def record_changes(user_id, model, object_ids, deleted=False):
+    """Give the objects a new sequence number as part of the write.
+
+    The change rows are written in the caller's transaction, so they
+    commit or roll back with the data. Writes made outside a transaction
+    are recorded in one of their own right after, and a crash in between
+    loses the change; clients recover by syncing again from `since=0`.
+    """
+    if object_ids:
+        _write_changes(user_id, model, object_ids, deleted)
+
+
+def changes_since(user_id, since, limit):
+    """Return up to `limit` changes after `since`, oldest first."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        _lock(cursor, user_id, shared=True)
+        return list(
+            Change.objects.filter(user_id=user_id, id__gt=since)
+            .order_by('id')[:limit]
+        )
@@ -5,7 +5,11 @@ Test for the Django admin modifications.
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from core.models import UserDeletion, Recipe, Tag, Ingredient
 
 
 class AdminSiteTests(TestCase):
@@ -49,3 +53,72 @@ class AdminSiteTests(TestCase):
 
         self.assertEqual(res.status_code, 200)
         self.assertTemplateUsed(res, 'admin/change_form.html')
+
+    def test_delete_user_queues_purge(self):
+        """Test deleting a user in the admin deactivates and queues it"""
+        url = reverse('admin:core_user_delete', args=[self.user.id])
+        res = self.client.post(url, {'post': 'yes'})
+
+        self.assertEqual(res.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(
+            UserDeletion.objects.filter(user=self.user).exists()
+        )
+
+    def _create_recipes(self, count):
+        return [
+            Recipe.objects.create(
+                user=self.user, title=f'Recipe {i}', time_minutes=5,
+                price='1.00',
+            )
+            for i in range(count)
+        ]
+
+    def test_recipe_changelist_queries_constant(self):
+        """Test the recipe list does not query per row for users"""
+        self._create_recipes(3)
+        url = reverse('admin:core_recipe_changelist')
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self._create_recipes(3)
+        with self.assertNumQueries(len(queries)):
+            self.client.get(url)
+
+        self.assertContains(res, self.user.email)
+
+    def test_attr_changelists(self):
+        """Test tags and ingredients have working admin pages"""
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+
+        res = self.client.get(
+            reverse('admin:core_tag_changelist'), {'q': 'vegan'}
+        )
+        self.assertContains(res, tag.name)
+        res = self.client.get(
+            reverse('admin:core_ingredient_changelist'),
+            {'q': str(ingredient.id)},
+        )
+        self.assertContains(res, ingredient.name)
+        res = self.client.get(
+            reverse('admin:core_recipe_add')
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertNotContains(res, '<option value="%d">' % tag.id)
+
+    def test_delete_in_batches_action(self):
+        """Test the batched delete action removes selected recipes"""
+        recipes = self._create_recipes(5)
+        keep = recipes.pop()
+        url = reverse('admin:core_recipe_changelist')
+
+        res = self.client.post(url, {
+            'action': 'delete_in_batches',
+            '_selected_action': [recipe.id for recipe in recipes],
+        })
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(list(Recipe.objects.all()), [keep])
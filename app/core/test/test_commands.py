@@ -1,8 +1,16 @@
+import json
+import tempfile
+from io import StringIO
 from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.db.utils import OperationalError
 
+from core.models import Recipe, Tag, Ingredient, UserStats, Change
+from core.purge import request_user_deletion
+
 
 class CommandTests(TestCase):
     """Test custom Django commands"""
@@ -21,3 +29,169 @@ class CommandTests(TestCase):
         mock_getitem.side_effect = [OperationalError] * 5 + [True]
         call_command('wait_for_db')
         self.assertEqual(mock_getitem.call_count, 6)
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    """Test the benchmark command"""
+
+    def test_benchmark_writes_report(self):
+        """Test the benchmark drives every endpoint and saves JSON"""
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'benchmark', users=2, recipes=3, tags=2, ingredients=3,
+                concurrency='1,2', requests=4, output=output.name,
+                stdout=StringIO(),
+            )
+            report = json.load(output)
+
+        endpoints = {result['endpoint'] for result in report['results']}
+        self.assertIn('recipe_list_filtered', endpoints)
+        self.assertIn('recipe_upload_image', endpoints)
+        self.assertIn('user_token', endpoints)
+        self.assertEqual(len(report['results']), len(endpoints) * 2)
+        for result in report['results']:
+            self.assertEqual(result['errors'], 0, result['endpoint'])
+            self.assertEqual(result['requests'], 4)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertFalse(
+            get_user_model().objects.filter(
+                email__startswith='bench-'
+            ).exists()
+        )
+
+
+class SeedDataCommandTests(TestCase):
+    """Test the seed_data command"""
+
+    def _seed(self, prefix, **options):
+        """Run seed_data and return the generated users."""
+        params = {
+            'users': 4, 'recipes_mean': 3, 'tags': 5, 'ingredients': 6,
+            'tags_per_recipe': 2, 'ingredients_per_recipe': 3, 'seed': 7,
+            'chunk_size': 7, 'email_prefix': prefix,
+        }
+        params.update(options)
+        call_command('seed_data', stdout=StringIO(), **params)
+        return get_user_model().objects.filter(
+            email__startswith=prefix
+        ).order_by('email')
+
+    def _shape(self, users):
+        """Return a comparable summary of the data owned by `users`."""
+        return [
+            [
+                (
+                    recipe.title, recipe.time_minutes, recipe.price,
+                    sorted(tag.name for tag in recipe.tags.all()),
+                    sorted(ing.name for ing in recipe.ingredients.all()),
+                )
+                for recipe in Recipe.objects.filter(user=user).order_by('id')
+            ]
+            for user in users
+        ]
+
+    def test_seed_data_creates_rows(self):
+        """Test seeding creates users with related data and a password"""
+        users = self._seed('a-')
+
+        self.assertEqual(users.count(), 4)
+        user = users.first()
+        self.assertTrue(user.check_password('password123'))
+        self.assertEqual(Tag.objects.filter(user=user).count(), 5)
+        self.assertEqual(Ingredient.objects.filter(user=user).count(), 6)
+        recipe = Recipe.objects.filter(user=user).first()
+        self.assertEqual(recipe.tags.count(), 2)
+        self.assertEqual(recipe.ingredients.count(), 3)
+        self.assertEqual(
+            Change.objects.filter(user=user).count(),
+            11 + Recipe.objects.filter(user=user).count(),
+        )
+
+    def test_seed_data_deterministic(self):
+        """Test the same seed always generates the same data"""
+        first = self._shape(self._seed('a-'))
+        second = self._shape(self._seed('b-', chunk_size=1000))
+        other = self._shape(self._seed('c-', seed=8))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_seed_data_writes_user_stats(self):
+        """Test seeded users get matching statistics rows"""
+        user = self._seed('a-').first()
+
+        stats = UserStats.objects.get(user=user)
+        recipes = Recipe.objects.filter(user=user)
+        self.assertEqual(stats.recipe_count, recipes.count())
+        self.assertEqual(stats.tag_count, 5)
+        self.assertEqual(
+            stats.price_max, max(recipe.price for recipe in recipes)
+        )
+
+
+class RecomputeStatsCommandTests(TestCase):
+    """Test the recompute_stats command"""
+
+    def test_recompute_repairs_drift(self):
+        """Test recomputing overwrites drifted and missing rows"""
+        user = get_user_model().objects.create_user(
+            'stats@example.com', 'password123'
+        )
+        other = get_user_model().objects.create_user(
+            'other@example.com', 'password123'
+        )
+        Recipe.objects.create(
+            user=user, title='Recipe', time_minutes=12, price='4.50'
+        )
+        Tag.objects.create(user=user, name='vegan')
+        UserStats.objects.filter(user=user).update(
+            recipe_count=42, tag_count=7
+        )
+        UserStats.objects.filter(user=other).delete()
+
+        call_command('recompute_stats', stdout=StringIO())
+
+        stats = UserStats.objects.get(user=user)
+        self.assertEqual(stats.recipe_count, 1)
+        self.assertEqual(stats.tag_count, 1)
+        self.assertEqual(stats.time_minutes_total, 12)
+        self.assertTrue(UserStats.objects.filter(user=other).exists())
+
+
+class PurgeDeletedUsersCommandTests(TestCase):
+    """Test the purge_deleted_users command"""
+
+    def test_purge_deleted_user(self):
+        """Test queued users are removed with their data in batches"""
+        user = get_user_model().objects.create_user(
+            'gone@example.com', 'password123'
+        )
+        keep = get_user_model().objects.create_user(
+            'keep@example.com', 'password123'
+        )
+        tag = Tag.objects.create(user=user, name='vegan')
+        salt = Ingredient.objects.create(user=user, name='salt')
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                user=user, title=f'Recipe {i}', time_minutes=5, price='1.00'
+            )
+            recipe.tags.add(tag)
+            recipe.ingredients.add(salt)
+        kept = Recipe.objects.create(
+            user=keep, title='Kept', time_minutes=5, price='1.00'
+        )
+        deletion = request_user_deletion(user)
+        self.assertEqual(deletion.total_objects, 7)
+
+        call_command('purge_deleted_users', batch_size=2, stdout=StringIO())
+
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.finished_at)
+        self.assertEqual(deletion.deleted_objects, 7)
+        self.assertEqual(deletion.progress, 1.0)
+        self.assertFalse(
+            get_user_model().objects.filter(email='gone@example.com').exists()
+        )
+        self.assertEqual(list(Recipe.objects.all()), [kept])
+        self.assertFalse(Recipe.tags.through.objects.exists())
+        self.assertFalse(Tag.objects.exists())
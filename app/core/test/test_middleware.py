@@ -0,0 +1,53 @@
+"""
+Tests for the per-prefix middleware chains
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+
+class PrefixMiddlewareTests(TestCase):
+    """Test /api/ and the rest of the site get different chains"""
+
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'password123'
+        )
+
+    def test_api_skips_session_middleware(self):
+        """Test API requests run without sessions, messages or CSRF"""
+        res = self.client.post(reverse('user:token'), {
+            'email': 'user@example.com', 'password': 'password123',
+        })
+
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(hasattr(res.wsgi_request, 'session'))
+        self.assertFalse(hasattr(res.wsgi_request, '_messages'))
+        self.assertEqual(res['X-Frame-Options'], 'DENY')
+
+    def test_admin_keeps_full_middleware(self):
+        """Test the admin still has sessions and CSRF protection"""
+        res = self.client.post(reverse('admin:login'), {
+            'username': 'user@example.com', 'password': 'password123',
+        })
+
+        self.assertEqual(res.status_code, 403)
+        self.assertTrue(hasattr(res.wsgi_request, 'session'))
+
+        res = self.client.get(reverse('admin:login'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('csrftoken', res.cookies)
+
+    def test_benchmark_middleware_command(self):
+        """Test the middleware benchmark reports both chains"""
+        out = StringIO()
+
+        call_command('benchmark_middleware', iterations=10, stdout=out)
+
+        self.assertIn('prefix', out.getvalue())
+        self.assertIn('Saving:', out.getvalue())
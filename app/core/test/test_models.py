@@ -83,11 +83,32 @@ class ModelTests(TestCase):
         ingredient = models.Ingredient.objects.create(
             name='Flour',
             user=user,
-            quantity=2,
-            measurement='cups'
         )
         self.assertEqual(str(ingredient), ingredient.name)
 
+    def test_recipe_ingredient_quantity(self):
+        """Test quantities are stored per recipe, not per ingredient"""
+        user = create_user()
+        flour = models.Ingredient.objects.create(name='Flour', user=user)
+        bread = models.Recipe.objects.create(
+            title='Bread', user=user, time_minutes=60, price=Decimal('2.00')
+        )
+        cake = models.Recipe.objects.create(
+            title='Cake', user=user, time_minutes=45, price=Decimal('6.00')
+        )
+        bread.ingredients.add(
+            flour, through_defaults={'quantity': 500, 'measurement': 'g'}
+        )
+        cake.ingredients.add(
+            flour, through_defaults={'quantity': 250, 'measurement': 'g'}
+        )
+
+        self.assertEqual(models.Ingredient.objects.count(), 1)
+        self.assertEqual(
+            bread.recipe_ingredients.get().quantity, 500
+        )
+        self.assertEqual(str(cake.recipe_ingredients.get()), '250 g Flour')
+
     @patch('core.models.uuid.uuid4')
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test that image is saved in the correct location"""
@@ -0,0 +1,62 @@
+"""
+Tests for the estimated count paginator
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import EmptyPage
+from django.test import TestCase
+
+from core.models import Recipe
+from core.pagination import EstimatedCountPaginator, query_estimate
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Test counting with planner estimates"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='pass123',
+        )
+        for i in range(5):
+            Recipe.objects.create(
+                user=self.user, title=f'Recipe {i}', time_minutes=5,
+                price=Decimal('1.00'),
+            )
+        self.recipes = Recipe.objects.filter(user=self.user).order_by('id')
+
+    def test_query_estimate(self):
+        """Test the planner estimate of a filtered queryset"""
+        self.assertGreaterEqual(query_estimate(self.recipes), 1)
+
+    def test_exact_count_below_threshold(self):
+        """Test small lists are counted exactly"""
+        paginator = EstimatedCountPaginator(self.recipes, 2)
+
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.count_is_approximate)
+        self.assertEqual(paginator.num_pages, 3)
+
+    @patch('core.pagination.query_estimate', return_value=3)
+    def test_estimated_count_above_threshold(self, mock_estimate):
+        """Test lists estimated above the threshold report the estimate"""
+        paginator = EstimatedCountPaginator(self.recipes, 2, threshold=2)
+
+        self.assertEqual(paginator.count, 3)
+        self.assertTrue(paginator.count_is_approximate)
+
+    @patch('core.pagination.query_estimate', return_value=1)
+    def test_pages_past_an_underestimate(self, mock_estimate):
+        """Test pages beyond the estimated count are still served"""
+        paginator = EstimatedCountPaginator(self.recipes, 2, threshold=0)
+        ids = list(self.recipes.values_list('id', flat=True))
+
+        page = paginator.page(2)
+        self.assertEqual([recipe.id for recipe in page], ids[2:4])
+        self.assertTrue(page.has_next())
+        page = paginator.page(3)
+        self.assertEqual([recipe.id for recipe in page], ids[4:])
+        self.assertFalse(page.has_next())
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
@@ -0,0 +1,89 @@
+"""
+Tests for the cached OpenAPI schema view
+"""
+import json
+import os
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.views import CachedSchemaView
+
+SCHEMA_URL = reverse('schema')
+
+
+class CachedSchemaViewTests(TestCase):
+    """Test the schema is built once and served with an ETag"""
+
+    def setUp(self):
+        CachedSchemaView.clear_cache()
+        self.addCleanup(CachedSchemaView.clear_cache)
+
+    def test_schema_cached_with_etag(self):
+        """Test the schema is served with cache headers and revalidates"""
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('/api/recipe/recipes/', json.loads(res.content)['paths'])
+        self.assertIn('max-age=', res['Cache-Control'])
+
+        res = self.client.get(
+            SCHEMA_URL, {'format': 'json'}, HTTP_IF_NONE_MATCH=res['ETag']
+        )
+        self.assertEqual(res.status_code, 304)
+
+    def test_schema_loaded_from_file(self):
+        """Test a schema written at build time is served as is"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'schema.json')
+            with open(path, 'w') as fh:
+                json.dump({'openapi': '3.0.3', 'paths': {}}, fh)
+
+            with override_settings(OPENAPI_SCHEMA_FILE=path):
+                res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(json.loads(res.content)['paths'], {})
+
+    def test_signed_tokens_documented(self):
+        """Test signed access tokens are documented as a bearer scheme"""
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        schemes = json.loads(res.content)['components']['securitySchemes']
+        self.assertEqual(
+            schemes['signedTokenAuth'], {'type': 'http', 'scheme': 'bearer'}
+        )
+
+    def test_batch_documented(self):
+        """Test the batch endpoint documents its request and response"""
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        schema = json.loads(res.content)
+        post = schema['paths']['/api/batch/']['post']
+        self.assertIn('requestBody', post)
+        self.assertEqual(
+            post['responses']['200']['content']['application/json']
+            ['schema']['$ref'],
+            '#/components/schemas/BatchResponse',
+        )
+
+    def test_changes_documented(self):
+        """Test the sync endpoint documents its response"""
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        schemas = json.loads(res.content)['components']['schemas']
+        self.assertEqual(
+            set(schemas['Changes']['properties']),
+            {'cursor', 'has_more', 'recipes', 'tags', 'ingredients'},
+        )
+
+    def test_unknown_language_shares_default_rendering(self):
+        """Test made-up languages don't add cache entries"""
+        self.client.get(SCHEMA_URL, {'format': 'json'})
+        self.client.get(SCHEMA_URL, {'format': 'json', 'lang': 'xyz'})
+        self.client.get(SCHEMA_URL, {'format': 'json', 'lang': 'de'})
+
+        self.assertEqual(
+            sorted(lang or '' for _, lang in CachedSchemaView._rendered),
+            ['', 'de'],
+        )
@@ -0,0 +1,128 @@
+"""
+Tests for the shared token bucket throttles
+"""
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ThrottleBucket
+from core.throttling import consume, parse_rate, purge_buckets
+
+TOKEN_URL = reverse('user:token')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+def throttle_rates(**rates):
+    """Override the throttle rates for a test."""
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': rates,
+    })
+
+
+class TokenBucketTests(TestCase):
+    """Test the bucket arithmetic"""
+
+    def test_parse_rate(self):
+        """Test rates are parsed into capacity and refill speed."""
+        self.assertEqual(parse_rate('10/min'), (10, 10 / 60))
+        self.assertEqual(parse_rate('2/s'), (2, 2))
+        self.assertEqual(parse_rate(None), (None, None))
+
+    def test_bucket_empties_and_refills(self):
+        """Test a bucket allows `capacity` requests then refills."""
+        for _ in range(3):
+            allowed, _ = consume('test:1', 3, 1, now=100)
+            self.assertTrue(allowed)
+
+        allowed, tokens = consume('test:1', 3, 1, now=100)
+        self.assertFalse(allowed)
+        self.assertEqual(tokens, 0)
+
+        allowed, _ = consume('test:1', 3, 1, now=101)
+        self.assertTrue(allowed)
+        self.assertEqual(ThrottleBucket.objects.count(), 1)
+
+    def test_buckets_are_independent(self):
+        """Test separate keys use separate buckets."""
+        consume('test:1', 1, 1, now=100)
+
+        allowed, _ = consume('test:2', 1, 1, now=100)
+
+        self.assertTrue(allowed)
+
+    def test_purge_full_buckets(self):
+        """Test only refilled buckets are purged."""
+        consume('test:1', 2, 1, now=100)
+        consume('test:2', 2, 1, now=105)
+
+        self.assertEqual(purge_buckets(now=103), 1)
+        self.assertTrue(ThrottleBucket.objects.filter(key='test:2').exists())
+
+
+class ThrottledEndpointTests(TestCase):
+    """Test throttles on the API endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'throttle@example.com', 'testpass123'
+        )
+
+    @throttle_rates(token='2/min')
+    def test_token_endpoint_throttled_per_ip(self):
+        """Test the token endpoint returns 429 with Retry-After."""
+        payload = {'email': 'throttle@example.com', 'password': 'wrong'}
+        with patch('core.throttling.time.time', return_value=1000):
+            for _ in range(2):
+                res = self.client.post(TOKEN_URL, payload)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '30')
+
+    @throttle_rates(token='1/min')
+    def test_token_endpoint_ignores_forwarded_for(self):
+        """Test clients can't pick their own address with X-Forwarded-For."""
+        payload = {'email': 'throttle@example.com', 'password': 'wrong'}
+        with patch('core.throttling.time.time', return_value=1000):
+            self.client.post(
+                TOKEN_URL, payload, HTTP_X_FORWARDED_FOR='10.0.0.1'
+            )
+            res = self.client.post(
+                TOKEN_URL, payload, HTTP_X_FORWARDED_FOR='x' * 300
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @throttle_rates(recipe_list='1/min')
+    def test_recipe_list_throttled_per_user(self):
+        """Test recipe list throttling is per user."""
+        other = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        self.client.force_authenticate(other)
+        res = self.client.get(RECIPES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @throttle_rates()
+    def test_unconfigured_scope_not_throttled(self):
+        """Test a scope without a rate is not throttled."""
+        self.client.force_authenticate(self.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,128 @@
+"""
+Token bucket throttles with state shared through the database.
+"""
+import hashlib
+import math
+import time
+
+from django.db import connection
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from core.models import ThrottleBucket
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Return (capacity, tokens per second) for a rate like `10/min`."""
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def consume(key, capacity, rate, now=None):
+    """Take one token from the bucket `key` in a single statement.
+
+    Returns (allowed, tokens left). The bucket refills continuously at
+    `rate` tokens per second up to `capacity`.
+    """
+    now = time.time() if now is None else now
+    table = connection.ops.quote_name(ThrottleBucket._meta.db_table)
+    refilled = (
+        'LEAST(%(capacity)s, '
+        'b.tokens + (%(now)s - b.updated_at) * %(rate)s)'
+    )
+    remaining = (
+        f'CASE WHEN {refilled} >= 1 THEN {refilled} - 1 ELSE {refilled} END'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} AS b '
+            '(key, tokens, updated_at, expires_at, allowed) '
+            'VALUES (%(key)s, %(capacity)s - 1, %(now)s, '
+            '%(now)s + 1 / %(rate)s, true) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            f'tokens = {remaining}, '
+            'updated_at = %(now)s, '
+            f'expires_at = %(now)s + (%(capacity)s - ({remaining})) '
+            '/ %(rate)s, '
+            f'allowed = {refilled} >= 1 '
+            'RETURNING allowed, tokens',
+            {
+                'key': key, 'capacity': float(capacity),
+                'rate': float(rate), 'now': now,
+            },
+        )
+        allowed, tokens = cursor.fetchone()
+    return allowed, tokens
+
+
+def purge_buckets(now=None):
+    """Delete buckets that have refilled completely and return the count."""
+    now = time.time() if now is None else now
+    deleted, _ = ThrottleBucket.objects.filter(expires_at__lt=now).delete()
+    return deleted
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base class for token bucket throttles.
+
+    Rates come from `DEFAULT_THROTTLE_RATES[scope]`; a scope without a
+    rate is not throttled.
+    """
+    scope = None
+
+    def get_scope(self, request, view):
+        """Return the rate scope for this request."""
+        return self.scope
+
+    def get_cache_key(self, request, view):
+        """Return the identity to throttle, or None to skip."""
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        if scope is None:
+            return True
+        capacity, rate = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        )
+        ident = self.get_cache_key(request, view)
+        if capacity is None or ident is None:
+            return True
+
+        allowed, tokens = consume(f'{scope}:{ident}', capacity, rate)
+        self.retry_after = None if allowed else (1 - tokens) / rate
+        return allowed
+
+    def wait(self):
+        if self.retry_after is None:
+            return None
+        return math.ceil(self.retry_after)
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Throttle expensive endpoints per user (or per IP when anonymous).
+
+    The scope is the view's `throttle_scope`, or the entry for the
+    current action in the view's `throttle_scopes` mapping.
+    """
+
+    def get_scope(self, request, view):
+        scopes = getattr(view, 'throttle_scopes', {})
+        return scopes.get(
+            getattr(view, 'action', None),
+            getattr(view, 'throttle_scope', None),
+        )
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user-{request.user.pk}'
+        # Hashed to bound the key length whatever the ident looks like.
+        ident = hashlib.sha1(self.get_ident(request).encode()).hexdigest()
+        return f'ip-{ident}'
@@ -0,0 +1,80 @@
+"""
+Views shared by the whole API.
+"""
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    Serve the OpenAPI schema built once per deploy.
+
+    The schema is read from `settings.OPENAPI_SCHEMA_FILE` when the build
+    wrote one (`manage.py spectacular --format openapi-json --file ...`),
+    or generated on the first request otherwise. Each rendering is kept
+    in memory with its ETag, so later requests cost a dictionary lookup.
+    """
+    _rendered = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def clear_cache(cls):
+        cls._rendered.clear()
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        # Unknown languages share the default rendering, so clients can't
+        # grow the cache with made-up codes.
+        lang = request.GET.get('lang')
+        if lang not in dict(settings.LANGUAGES):
+            lang = None
+        key = (renderer.media_type, lang)
+        entry = self._rendered.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._rendered.get(key)
+                if entry is None:
+                    entry = self._render(lang, request, *args, **kwargs)
+                    self._rendered[key] = entry
+        etag, content = entry
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f'; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.SCHEMA_CACHE_MAX_AGE
+        )
+        return response
+
+    def _load_file(self):
+        try:
+            with open(settings.OPENAPI_SCHEMA_FILE) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def _render(self, lang, request, *args, **kwargs):
+        """Return the ETag and rendered bytes of the schema in `lang`."""
+        data = None
+        if lang is None:
+            data = self._load_file()
+        if data is None:
+            data = super().get(request, *args, **kwargs).data
+        content = request.accepted_renderer.render(
+            data, renderer_context=self.get_renderer_context()
+        )
+        return f'"{hashlib.sha256(content).hexdigest()}"', content
@@ -0,0 +1,220 @@
+"""
+Reusable viewset mixins for the recipe API.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core.models import IdempotencyKey
+from recipe.renderers import ColumnarJSONRenderer
+
+
+class SparseFieldsMixin:
+    """
+    Limit read responses to the fields named in `?fields=`.
+
+    The same field list drives the SELECT list of the queryset, and
+    relations that are not requested are never prefetched.
+    `prefetch_fields` maps serializer fields to custom prefetch lookups.
+    """
+    sparse_actions = ('list', 'retrieve')
+    prefetch_fields = {}
+
+    def get_requested_fields(self):
+        """Return the requested field names, or None for all fields."""
+        if self.action not in self.sparse_actions:
+            return None
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return None
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        available = self.get_serializer_class().Meta.fields
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValidationError(
+                {'fields': f'Unknown fields: {", ".join(unknown)}'}
+            )
+        return requested
+
+    def get_serializer(self, *args, **kwargs):
+        """Pass the requested fields to the serializer."""
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def project_queryset(self, queryset):
+        """Select only the columns and relations that will be rendered."""
+        if self.action not in self.sparse_actions:
+            return queryset
+        fields = (
+            self.get_requested_fields()
+            or self.get_serializer_class().Meta.fields
+        )
+        opts = queryset.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        many_to_many = {field.name for field in opts.many_to_many}
+        columns = [name for name in fields if name in concrete]
+        relations = [
+            self.prefetch_fields.get(name, name) for name in fields
+            if name in self.prefetch_fields or name in many_to_many
+        ]
+        queryset = queryset.only(opts.pk.name, *columns)
+        if relations:
+            queryset = queryset.prefetch_related(*relations)
+        return queryset
+
+
+class ColumnarListMixin:
+    """
+    Stream list responses when the columnar renderer is negotiated.
+
+    Only the ordered primary keys are loaded up front; objects are then
+    fetched, serialized and written out chunk by chunk. The stream always
+    covers the whole list, so pagination does not apply to it.
+    """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        ColumnarJSONRenderer
+    ]
+    columnar_chunk_size = 500
+
+    def columnar_requested(self):
+        """Return True if the columnar renderer was negotiated."""
+        return isinstance(
+            getattr(self.request, 'accepted_renderer', None),
+            ColumnarJSONRenderer,
+        )
+
+    def list(self, request, *args, **kwargs):
+        """List objects, streaming them in the columnar format."""
+        if not self.columnar_requested():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        pks = list(queryset.values_list('pk', flat=True))
+        columns = list(self.get_serializer([], many=True).child.fields)
+
+        def chunks():
+            for start in range(0, len(pks), self.columnar_chunk_size):
+                chunk = pks[start:start + self.columnar_chunk_size]
+                objs = queryset.filter(pk__in=chunk).in_bulk()
+                yield self.get_serializer(
+                    [objs[pk] for pk in chunk if pk in objs], many=True
+                ).data
+
+        return StreamingHttpResponse(
+            request.accepted_renderer.stream(columns, chunks()),
+            content_type=request.accepted_renderer.media_type,
+        )
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is in progress.'
+    default_code = 'idempotency_key_in_use'
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was used for another request.'
+    default_code = 'idempotency_key_mismatch'
+
+
+class IdempotencyMixin:
+    """
+    Replay the first response of writes sent with an `Idempotency-Key`.
+
+    The key row doubles as a lock: only the request that inserts it runs
+    the handler, concurrent duplicates get 409 until the response is
+    stored. Only successful responses are stored: failed requests, whether
+    they raise or return an error response, release the key so they can
+    be retried.
+    """
+    idempotent_methods = ('POST', 'PUT', 'PATCH')
+    idempotency_ttl = timedelta(hours=24)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        key = request.META.get('HTTP_IDEMPOTENCY_KEY')
+        if not key or request.method not in self.idempotent_methods:
+            return
+        if len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            raise ValidationError({'Idempotency-Key': 'Key is too long.'})
+        # Dispatch looks the handler up after initial(), so wrap it here.
+        # Methods the view doesn't implement are left for dispatch to
+        # answer with 405.
+        method = request.method.lower()
+        handler = getattr(self, method, None)
+        if handler is None:
+            return
+
+        def idempotent_handler(request, *args, **kwargs):
+            return self._handle_idempotent(
+                key, handler, request, *args, **kwargs
+            )
+
+        setattr(self, method, idempotent_handler)
+
+    def _request_hash(self, request):
+        """Fingerprint the request so a key can't be reused for another."""
+        data = request.data
+        if hasattr(data, 'lists'):
+            data = dict(data.lists())
+        payload = json.dumps(
+            [request.method, request.path, data], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _claim_key(self, key, request_hash):
+        """Return (record, created) for the user's key."""
+        lookup = {'user': self.request.user, 'key': key}
+        defaults = {
+            'request_hash': request_hash,
+            'expires_at': timezone.now() + self.idempotency_ttl,
+        }
+        record, created = IdempotencyKey.objects.get_or_create(
+            **lookup, defaults=defaults
+        )
+        if not created and record.expires_at <= timezone.now():
+            IdempotencyKey.objects.filter(
+                pk=record.pk, expires_at__lte=timezone.now()
+            ).delete()
+            record, created = IdempotencyKey.objects.get_or_create(
+                **lookup, defaults=defaults
+            )
+        return record, created
+
+    def _handle_idempotent(self, key, handler, request, *args, **kwargs):
+        request_hash = self._request_hash(request)
+        record, created = self._claim_key(key, request_hash)
+        if not created:
+            if record.request_hash != request_hash:
+                raise IdempotencyKeyMismatch()
+            if record.status_code is None:
+                raise IdempotencyKeyInUse()
+            return Response(
+                record.response,
+                status=record.status_code,
+                headers={'Idempotent-Replayed': 'true'},
+            )
+
+        try:
+            response = handler(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 400:
+            record.delete()
+            return response
+        record.status_code = response.status_code
+        record.response = response.data
+        record.save(update_fields=['status_code', 'response'])
+        return response
@@ -0,0 +1,63 @@
+"""
+Renderers for the recipe API.
+"""
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+def _dumps(data):
+    """Serialize `data` to compact JSON."""
+    return json.dumps(
+        data, cls=encoders.JSONEncoder, separators=(',', ':'),
+        ensure_ascii=False,
+    )
+
+
+def _flatten(value):
+    """Replace nested objects by their IDs."""
+    if isinstance(value, list):
+        return [
+            item['id'] if isinstance(item, dict) and 'id' in item else item
+            for item in value
+        ]
+    if isinstance(value, dict) and 'id' in value:
+        return value['id']
+    return value
+
+
+class ColumnarJSONRenderer(BaseRenderer):
+    """
+    Render lists as a header of column names followed by row arrays.
+
+    `{"columns": ["id", "title"], "rows": [[1, "Soup"], [2, "Pie"]]}`
+    Nested relations are rendered as arrays of IDs. Anything that is not
+    a list of objects is rendered as plain JSON.
+    """
+    media_type = 'application/vnd.recipe.columnar+json'
+    format = 'columnar'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` in a single pass."""
+        if data is None:
+            return b''
+        if not isinstance(data, list):
+            return _dumps(data).encode('utf-8')
+        columns = list(data[0]) if data else []
+        return b''.join(self.stream(columns, [data]))
+
+    def stream(self, columns, chunks):
+        """Yield the encoded document for `chunks` of row dicts."""
+        yield ('{"columns":%s,"rows":[' % _dumps(columns)).encode('utf-8')
+        separator = ''
+        for chunk in chunks:
+            rows = ','.join(
+                _dumps([_flatten(row[column]) for column in columns])
+                for row in chunk
+            )
+            if rows:
+                yield (separator + rows).encode('utf-8')
+                separator = ','
+        yield b']}'
@@ -1,8 +1,21 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from core.models import Recipe, Tag, Ingredient
+from core.models import Recipe, Tag, Ingredient, RecipeIngredient
+
+
+class DynamicFieldsMixin:
+    """Serializer mixin limiting the output to a `fields` keyword argument."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 
-class TagsSerializer(serializers.ModelSerializer):
+class TagsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Tag objects."""
     class Meta:
         model = Tag
@@ -14,11 +27,24 @@ class TagsSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class IngredientsSerializer(serializers.ModelSerializer):
+class IngredientsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Ingredient objects."""
     class Meta:
         model = Ingredient
-        fields = ['id', 'name', 'quantity', 'measurement']
+        fields = ['id', 'name']
+
+    def validate_name(self, value):
+        """Reject names the user already gave another ingredient."""
+        ingredients = Ingredient.objects.filter(
+            user=self.context['request'].user, name=value
+        )
+        if self.instance is not None:
+            ingredients = ingredients.exclude(pk=self.instance.pk)
+        if ingredients.exists():
+            raise serializers.ValidationError(
+                'You already have an ingredient with this name.'
+            )
+        return value
 
     def create(self, validated_data):
         """Create an Ingredient with the user context."""
@@ -26,19 +52,64 @@ class IngredientsSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class TagsWithCountSerializer(TagsSerializer):
+    """Serializer for Tag objects annotated with their recipe count."""
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagsSerializer.Meta):
+        fields = TagsSerializer.Meta.fields + ['recipe_count']
+
+
+class IngredientsWithCountSerializer(IngredientsSerializer):
+    """Serializer for Ingredient objects annotated with recipe count."""
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientsSerializer.Meta):
+        fields = IngredientsSerializer.Meta.fields + ['recipe_count']
+
+
+class RecipeIngredientRefSerializer(serializers.ModelSerializer):
+    """Serializer for recipe ingredients referencing the ingredient by ID."""
+    id = serializers.IntegerField(source='ingredient_id', read_only=True)
+
+    class Meta:
+        model = RecipeIngredient
+        fields = ['id', 'quantity', 'measurement']
+
+
+class RecipeIngredientSerializer(RecipeIngredientRefSerializer):
+    """Serializer for recipe ingredients with their per-recipe quantity."""
+    name = serializers.CharField(source='ingredient.name', max_length=100)
+
+    class Meta(RecipeIngredientRefSerializer.Meta):
+        fields = ['id', 'name', 'quantity', 'measurement']
+
+
+class RecipeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Recipe objects."""
     tags = TagsSerializer(many=True, required=False)
-    ingredients = IngredientsSerializer(many=True, required=False)
+    ingredients = RecipeIngredientSerializer(
+        many=True, required=False, source='recipe_ingredients'
+    )
 
     class Meta:
         model = Recipe
         fields = [
             'id', 'title', 'time_minutes',
-            'price', 'link', 'tags', 'ingredients',
+            'price', 'link', 'tags', 'ingredients', 'is_public',
         ]
         read_only_fields = ['id']
 
+    def validate_ingredients(self, value):
+        """Reject payloads listing an ingredient more than once."""
+        names = [item['ingredient']['name'] for item in value]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise serializers.ValidationError(
+                f'Ingredients listed more than once: {", ".join(duplicates)}'
+            )
+        return value
+
     def _get_or_create_tags(self, tags_data, recipe):
         """Helper method to get or create tags."""
         if tags_data:
@@ -50,19 +121,23 @@ class RecipeSerializer(serializers.ModelSerializer):
                 recipe.tags.add(tag_obj)
 
     def _get_or_create_ingredients(self, ingredients_data, recipe):
-        """Helper method to get or create tags."""
+        """Helper method to get or create ingredients with quantities."""
         if ingredients_data:
             for ingredient_data in ingredients_data:
+                name = ingredient_data['ingredient']['name']
                 ingredient_obj, created = Ingredient.objects.get_or_create(
                     user=recipe.user,
-                    **ingredient_data
+                    name=name
                 )
-                recipe.ingredients.add(ingredient_obj)
+                recipe.ingredients.add(ingredient_obj, through_defaults={
+                    'quantity': ingredient_data.get('quantity'),
+                    'measurement': ingredient_data.get('measurement'),
+                })
 
     def create(self, validated_data):
         """Create a new Recipe."""
         tags_data = validated_data.pop('tags', [])
-        ingredients_data = validated_data.pop('ingredients', [])
+        ingredients_data = validated_data.pop('recipe_ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
         self._get_or_create_tags(tags_data, recipe)
         self._get_or_create_ingredients(ingredients_data, recipe)
@@ -71,7 +146,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """Update an existing Recipe."""
         tags = validated_data.pop('tags', [])
-        ingredients = validated_data.pop('ingredients', [])
+        ingredients = validated_data.pop('recipe_ingredients', [])
         if tags is not None:
             instance.tags.clear()
             self._get_or_create_tags(tags, instance)
@@ -87,6 +162,74 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class RecipeSideloadSerializer(RecipeSerializer):
+    """Serializer for Recipe objects referencing tags and ingredients by ID."""
+    tags = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    ingredients = RecipeIngredientRefSerializer(
+        many=True, read_only=True, source='recipe_ingredients'
+    )
+
+
+class RecipeSyncSerializer(RecipeSideloadSerializer):
+    """Serializer for full Recipe objects in delta sync responses."""
+    class Meta(RecipeSideloadSerializer.Meta):
+        model = Recipe
+        fields = RecipeSideloadSerializer.Meta.fields + [
+            'description', 'image',
+        ]
+
+
+class ChangeSetSerializer(serializers.Serializer):
+    """Serializer for the changes to one kind of object since a cursor."""
+    deleted = serializers.ListField(child=serializers.IntegerField())
+
+
+class RecipeChangeSetSerializer(ChangeSetSerializer):
+    """Serializer for the recipes changed since a cursor."""
+    created = RecipeSyncSerializer(many=True)
+    updated = RecipeSyncSerializer(many=True)
+
+
+class TagChangeSetSerializer(ChangeSetSerializer):
+    """Serializer for the tags changed since a cursor."""
+    created = TagsSerializer(many=True)
+    updated = TagsSerializer(many=True)
+
+
+class IngredientChangeSetSerializer(ChangeSetSerializer):
+    """Serializer for the ingredients changed since a cursor."""
+    created = IngredientsSerializer(many=True)
+    updated = IngredientsSerializer(many=True)
+
+
+class ChangesSerializer(serializers.Serializer):
+    """Serializer for a page of delta sync changes."""
+    cursor = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+    recipes = RecipeChangeSetSerializer()
+    tags = TagChangeSetSerializer()
+    ingredients = IngredientChangeSetSerializer()
+
+
+class SimilarRecipeSerializer(RecipeSerializer):
+    """Serializer for Recipe objects ranked by similarity."""
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        model = Recipe
+        fields = RecipeSerializer.Meta.fields + ['similarity']
+
+
+class CookableRecipeSerializer(RecipeSerializer):
+    """Serializer for Recipe objects ranked by ingredient coverage."""
+    coverage = serializers.FloatField(read_only=True)
+    missing = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        model = Recipe
+        fields = RecipeSerializer.Meta.fields + ['coverage', 'missing']
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for Recipe objects with extra details."""
     class Meta(RecipeSerializer.Meta):
@@ -94,6 +237,47 @@ class RecipeDetailSerializer(RecipeSerializer):
         fields = RecipeSerializer.Meta.fields + ['description', 'image']
 
 
+class ShoppingListRecipeSerializer(serializers.Serializer):
+    """Serializer for a recipe and how many times it will be made."""
+    id = serializers.IntegerField()
+    servings = serializers.DecimalField(
+        max_digits=6, decimal_places=2, min_value=Decimal('0.01'),
+        default=Decimal('1'),
+    )
+
+
+class ShoppingListSerializer(serializers.Serializer):
+    """Serializer for the recipes of a shopping list."""
+    max_recipes = 100
+    recipes = ShoppingListRecipeSerializer(many=True, allow_empty=False)
+
+    def validate_recipes(self, value):
+        if len(value) > self.max_recipes:
+            raise serializers.ValidationError(
+                f'At most {self.max_recipes} recipes are allowed.'
+            )
+        return value
+
+
+class ShoppingListItemSerializer(serializers.Serializer):
+    """Serializer for the total quantity of an ingredient in a unit."""
+    name = serializers.CharField()
+    unit = serializers.CharField(allow_null=True)
+    quantity = serializers.DecimalField(
+        max_digits=16, decimal_places=2, allow_null=True
+    )
+
+
+class PublicRecipeSerializer(RecipeDetailSerializer):
+    """Serializer for the recipes of the public feed."""
+    class Meta(RecipeDetailSerializer.Meta):
+        model = Recipe
+        fields = [
+            name for name in RecipeDetailSerializer.Meta.fields
+            if name != 'is_public'
+        ]
+
+
 class RecipeImageSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(use_url=True)
     """Serializer for Recipe Image objects."""
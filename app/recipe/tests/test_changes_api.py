@@ -0,0 +1,141 @@
+"""
+Tests for the delta sync API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag, Ingredient
+
+CHANGES_URL = reverse('recipe:changes')
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {'title': 'Soup', 'time_minutes': 10, 'price': Decimal('5')}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class PublicChangesApiTests(TestCase):
+    """Test unauthenticated sync requests."""
+
+    def test_auth_required(self):
+        """Test authentication is required."""
+        res = APIClient().get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateChangesApiTests(TestCase):
+    """Test authenticated sync requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since=0, **params):
+        res = self.client.get(CHANGES_URL, {'since': since, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_full_sync(self):
+        """Test since=0 returns every object as created."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        recipe.tags.add(tag)
+
+        data = self.sync()
+
+        self.assertEqual(data['recipes']['created'][0]['tags'], [tag.id])
+        self.assertEqual(data['tags']['created'], [
+            {'id': tag.id, 'name': 'Dinner'},
+        ])
+        self.assertFalse(data['has_more'])
+
+    def test_delta_sync(self):
+        """Test only changes after the cursor are returned."""
+        untouched = create_recipe(self.user, title='Old')
+        edited = create_recipe(self.user, title='Edited')
+        removed = create_recipe(self.user, title='Removed')
+        cursor = self.sync()['cursor']
+
+        removed_id = removed.id
+        edited.title = 'Edited again'
+        edited.save()
+        removed.delete()
+        added = create_recipe(self.user, title='New')
+        data = self.sync(cursor)
+
+        recipes = data['recipes']
+        self.assertEqual([r['id'] for r in recipes['created']], [added.id])
+        self.assertEqual([r['id'] for r in recipes['updated']], [edited.id])
+        self.assertEqual(recipes['deleted'], [removed_id])
+        self.assertNotIn(
+            untouched.id, [r['id'] for r in recipes['updated']]
+        )
+        self.assertEqual(self.sync(data['cursor'])['recipes']['updated'], [])
+
+    def test_deleting_tag_updates_recipes(self):
+        """Test recipes losing a deleted tag are reported as updated."""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        recipe.tags.add(tag)
+        tag_id = tag.id
+        cursor = self.sync()['cursor']
+
+        tag.delete()
+        data = self.sync(cursor)
+
+        self.assertEqual(data['tags']['deleted'], [tag_id])
+        self.assertEqual(data['recipes']['updated'][0]['tags'], [])
+
+    def test_pages(self):
+        """Test changes are returned in bounded pages."""
+        for i in range(5):
+            Ingredient.objects.create(user=self.user, name=str(i))
+
+        first = self.sync(limit=3)
+        second = self.sync(first['cursor'], limit=3)
+
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        names = [
+            item['name'] for page in (first, second)
+            for item in page['ingredients']['created']
+        ]
+        self.assertEqual(sorted(names), ['0', '1', '2', '3', '4'])
+
+    def test_other_users_changes_hidden(self):
+        """Test changes of other users are not returned."""
+        other = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        create_recipe(other)
+
+        data = self.sync()
+
+        self.assertEqual(data['recipes']['created'], [])
+
+    def test_changes_roll_back_with_write(self):
+        """Test change records are part of the write's transaction."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            create_recipe(self.user)
+            self.assertEqual(len(self.sync()['recipes']['created']), 1)
+            raise RuntimeError
+
+        self.assertEqual(self.sync()['recipes']['created'], [])
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected."""
+        res = self.client.get(CHANGES_URL, {'since': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
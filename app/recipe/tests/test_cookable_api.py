@@ -0,0 +1,94 @@
+"""
+Tests for ranking recipes by the ingredients at hand.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Ingredient
+
+COOKABLE_URL = reverse('recipe:recipe-cookable')
+
+
+class CookableRecipesApiTests(TestCase):
+    """Test ranking recipes by ingredient coverage."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ('Rice', 'Beans', 'Corn', 'Salt')
+        ]
+
+    def create_recipe(self, ingredients, user=None):
+        recipe = Recipe.objects.create(
+            user=user or self.user, title='Bowl', time_minutes=10,
+            price=Decimal('5'),
+        )
+        recipe.ingredients.add(*(self.ingredients[i] for i in ingredients))
+        return recipe
+
+    def cookable(self, ingredients, **params):
+        return self.client.get(COOKABLE_URL, {
+            'ingredients': ','.join(
+                str(self.ingredients[i].id) for i in ingredients
+            ),
+            **params,
+        })
+
+    def test_ranked_by_coverage(self):
+        """Test recipes are ranked by coverage, then missing ingredients."""
+        complete = self.create_recipe([0, 1])
+        half = self.create_recipe([0, 2])
+        half_of_more = self.create_recipe([1, 2, 3, 0])
+        self.create_recipe([2, 3])
+
+        res = self.cookable([0, 1])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['id'], item['coverage'], item['missing'])
+             for item in res.data],
+            [
+                (complete.id, 1.0, 0),
+                (half.id, 0.5, 1),
+                (half_of_more.id, 0.5, 2),
+            ],
+        )
+        self.assertEqual(len(res.data[2]['ingredients']), 4)
+
+    def test_limit(self):
+        """Test the number of results can be limited."""
+        self.create_recipe([0])
+        newest = self.create_recipe([0])
+
+        res = self.cookable([0], limit=1)
+
+        self.assertEqual([item['id'] for item in res.data], [newest.id])
+
+    def test_limited_to_user(self):
+        """Test recipes of other users are not ranked."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        self.create_recipe([0], user=other_user)
+
+        res = self.cookable([0])
+
+        self.assertEqual(res.data, [])
+
+    def test_ingredients_required(self):
+        """Test the ingredient IDs are validated."""
+        res = self.client.get(COOKABLE_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(COOKABLE_URL, {'ingredients': 'rice'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,161 @@
+"""
+Tests for the public recipe feed API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import feed
+from core.models import Recipe, Tag
+from core.purge import request_user_deletion
+
+FEED_URL = reverse('recipe:feed')
+
+
+class PublicFeedApiTests(TestCase):
+    """Test the feed of public recipes."""
+
+    def setUp(self):
+        caches['feed'].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123'
+        )
+        self.other = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def write(self, func, *args, **kwargs):
+        """Run a write and the invalidations it commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return func(*args, **kwargs)
+
+    def create_recipe(self, user=None, **params):
+        defaults = {
+            'title': 'Soup', 'time_minutes': 10, 'price': Decimal('5'),
+            'is_public': True,
+        }
+        defaults.update(params)
+        return self.write(
+            Recipe.objects.create, user=user or self.other, **defaults
+        )
+
+    def get_ids(self, **params):
+        res = self.client.get(FEED_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in res.data['results']], res.data['next']
+
+    def test_lists_public_recipes_newest_first(self):
+        """Test only public recipes of every user are listed."""
+        old = self.create_recipe()
+        self.create_recipe(is_public=False)
+        new = self.create_recipe(user=self.user)
+
+        ids, next_url = self.get_ids()
+
+        self.assertEqual(ids, [new.id, old.id])
+        self.assertIsNone(next_url)
+
+    def test_cursor_pagination(self):
+        """Test following `next` through the whole feed."""
+        recipes = [self.create_recipe() for _ in range(25)]
+
+        ids, next_url = self.get_ids()
+        self.assertEqual(ids, [recipe.id for recipe in recipes[:4:-1]])
+        res = self.client.get(next_url)
+
+        self.assertEqual(
+            [item['id'] for item in res.data['results']],
+            [recipe.id for recipe in recipes[4::-1]],
+        )
+        self.assertIsNone(res.data['next'])
+
+    def test_pages_cached_for_all_users(self):
+        """Test a page is built once and served to other users."""
+        self.create_recipe()
+        self.get_ids()
+
+        self.client.force_authenticate(self.other)
+        with CaptureQueriesContext(connection) as queries:
+            self.get_ids()
+
+        self.assertFalse(any(
+            Recipe._meta.db_table in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_publish_and_unpublish(self):
+        """Test publishing changes show up immediately."""
+        recipe = self.create_recipe(is_public=False)
+        self.assertEqual(self.get_ids()[0], [])
+
+        recipe.is_public = True
+        self.write(recipe.save)
+        self.assertEqual(self.get_ids()[0], [recipe.id])
+
+        recipe.is_public = False
+        self.write(recipe.save)
+        self.assertEqual(self.get_ids()[0], [])
+
+    def test_edits_of_public_recipes_invalidate(self):
+        """Test edits and relation changes of public recipes show up."""
+        recipe = self.create_recipe()
+        tag = self.write(Tag.objects.create, user=self.other, name='Vegan')
+        self.get_ids()
+
+        self.write(recipe.tags.add, tag)
+        res = self.client.get(FEED_URL)
+        self.assertEqual(res.data['results'][0]['tags'][0]['name'], 'Vegan')
+
+        tag.name = 'Plant based'
+        self.write(tag.save)
+        res = self.client.get(FEED_URL)
+        self.assertEqual(
+            res.data['results'][0]['tags'][0]['name'], 'Plant based'
+        )
+
+    def test_unrelated_pages_stay_cached(self):
+        """Test publishing only invalidates the pages it affects."""
+        older = [self.create_recipe() for _ in range(21)]
+        recent = [self.create_recipe() for _ in range(20)]
+        # Put the next recipe in a shard of its own.
+        Recipe.objects.bulk_create([
+            Recipe(
+                user=self.other, title='Private', time_minutes=1,
+                price=Decimal('1'),
+            )
+            for _ in range(feed.SHARD_SIZE)
+        ])
+        self.get_ids()
+        self.get_ids(before=recent[0].id)
+
+        new = self.create_recipe()
+
+        with CaptureQueriesContext(connection) as queries:
+            ids, _ = self.get_ids(before=recent[0].id)
+        self.assertEqual(ids, [recipe.id for recipe in older[:0:-1]])
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self.get_ids()[0][0], new.id)
+
+    def test_deleted_users_recipes_hidden(self):
+        """Test recipes leave the feed when their owner asks for deletion."""
+        self.create_recipe()
+        self.get_ids()
+
+        self.write(request_user_deletion, self.other)
+
+        self.assertEqual(self.get_ids()[0], [])
+
+    def test_invalid_cursor(self):
+        """Test non-positive or non-numeric cursors are rejected."""
+        for before in ('0', 'abc'):
+            res = self.client.get(FEED_URL, {'before': before})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -49,15 +49,11 @@ class PrivateIngredientApiTests(TestCase):
         """Test retrieving a list of ingredients."""
         Ingredient.objects.create(
             user=self.user,
-            name='Apple',
-            quantity=2,
-            measurement=None
+            name='Apple'
         )
         Ingredient.objects.create(
             user=self.user,
-            name='Banana',
-            quantity=2,
-            measurement=None
+            name='Banana'
         )
 
         res = self.client.get(INGREDIENT_URL)
@@ -77,15 +73,11 @@ class PrivateIngredientApiTests(TestCase):
         )
         Ingredient.objects.create(
             user=user2,
-            name='Orange',
-            quantity=1,
-            measurement=None
+            name='Orange'
         )
         ingredient = Ingredient.objects.create(
             user=self.user,
-            name='Apple',
-            quantity=2,
-            measurement=None
+            name='Apple'
         )
 
         res = self.client.get(INGREDIENT_URL)
@@ -99,14 +91,10 @@ class PrivateIngredientApiTests(TestCase):
         """Test updating an ingredient."""
         ingredient = Ingredient.objects.create(
             user=self.user,
-            name='Apple',
-            quantity=2,
-            measurement=None
+            name='Apple'
         )
         payload = {
             'name': 'Updated Apple',
-            'quantity': 3,
-            'measurement': 'kg'
         }
         url = detail_url(ingredient.id)
         res = self.client.put(url, payload)
@@ -114,16 +102,29 @@ class PrivateIngredientApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(ingredient.name, payload['name'])
-        self.assertEqual(ingredient.quantity, payload['quantity'])
-        self.assertEqual(ingredient.measurement, payload['measurement'])
+
+    def test_rename_ingredient_to_duplicate_error(self):
+        """Test renaming an ingredient to a name already in use fails."""
+        Ingredient.objects.create(user=self.user, name='Salt')
+        ingredient = Ingredient.objects.create(user=self.user, name='Pepper')
+        url = detail_url(ingredient.id)
+
+        res = self.client.patch(url, {'name': 'Salt'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', res.data)
+        ingredient.refresh_from_db()
+        self.assertEqual(ingredient.name, 'Pepper')
+
+        res = self.client.patch(url, {'name': 'Pepper'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
 
     def test_delete_ingredient(self):
         """Test deleting an ingredient."""
         ingredient = Ingredient.objects.create(
             user=self.user,
-            name='Apple',
-            quantity=2,
-            measurement=None
+            name='Apple'
         )
         url = detail_url(ingredient.id)
         res = self.client.delete(url)
@@ -137,13 +138,11 @@ class PrivateIngredientApiTests(TestCase):
         """Test filtering ingredients by those assigned to a recipe."""
         ingredient1 = Ingredient.objects.create(
             user=self.user,
-            name='tomato',
-            quantity=2
+            name='tomato'
         )
         ingredient2 = Ingredient.objects.create(
             user=self.user,
-            name='foo',
-            quantity=2
+            name='foo'
         )
         recipe = Recipe.objects.create(
             title='Recipe 1',
@@ -163,13 +162,11 @@ class PrivateIngredientApiTests(TestCase):
         """Test that ingredients are unique for each user."""
         Ingredient.objects.create(
             user=self.user,
-            name='tomato',
-            quantity=2
+            name='tomato'
         )
         ing = Ingredient.objects.create(
             user=self.user,
-            name='falafel',
-            quantity=5
+            name='falafel'
         )
         recipe1 = Recipe.objects.create(
             title='recipe 1',
@@ -188,4 +185,26 @@ class PrivateIngredientApiTests(TestCase):
         res = self.client.get(INGREDIENT_URL, {'assigned_only': 1})
 
         self.assertEqual(len(res.data), 1)
+
+    def test_assigned_ingredients_with_counts(self):
+        """Test combining assigned_only with recipe counts."""
+        Ingredient.objects.create(user=self.user, name='unused')
+        ing = Ingredient.objects.create(user=self.user, name='salt')
+        for i in range(2):
+            recipe = Recipe.objects.create(
+                title=f'recipe {i}',
+                time_minutes=10,
+                price=Decimal('5.00'),
+                user=self.user
+            )
+            recipe.ingredients.add(ing)
+
+        res = self.client.get(
+            INGREDIENT_URL, {'assigned_only': 1, 'with_counts': 1}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['id'], ing.id)
+        self.assertEqual(res.data[0]['recipe_count'], 2)
 # Add a blank line at the end of the file
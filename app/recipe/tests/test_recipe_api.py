@@ -2,10 +2,14 @@
 Test for recipe API.
 """
 from decimal import Decimal
+import json
 import tempfile
 import os
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -13,10 +17,13 @@ from rest_framework import status
 
 
 from PIL import Image
+from core.cache import get_data_version
+from core.detail_cache import RecipeDetailCache, recipe_details
 from core.models import (
     Recipe,
     Tag,
     Ingredient,
+    IdempotencyKey,
 )
 from recipe.serializers import (
     RecipeSerializer,
@@ -24,6 +31,7 @@ from recipe.serializers import (
 )
 
 RECIPE_URL = reverse('recipe:recipe-list')
+FACETS_URL = reverse('recipe:recipe-facets')
 
 
 def detail_url(recipe_id):
@@ -111,6 +119,35 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_paginated_recipe_list(self):
+        """Test listing recipes one page at a time."""
+        recipes = [
+            create_recipe(self.user, title=f'Recipe {i}') for i in range(3)
+        ]
+
+        res = self.client.get(RECIPE_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 3)
+        self.assertFalse(res.data['count_is_approximate'])
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['results']],
+            [recipes[2].id, recipes[1].id],
+        )
+        self.assertIn('page=2', res.data['next'])
+
+    def test_paginated_recipe_list_estimated_count(self):
+        """Test large lists report an approximate count."""
+        create_recipe(self.user)
+
+        with patch('core.pagination.query_estimate', return_value=500000):
+            res = self.client.get(RECIPE_URL, {'page_size': 2})
+
+        self.assertEqual(res.data['count'], 500000)
+        self.assertTrue(res.data['count_is_approximate'])
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNone(res.data['next'])
+
     def test_get_recipe_detail(self):
         """Test retrieving a single recipe detail."""
         recipe = create_recipe(self.user)
@@ -275,6 +312,23 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.data['ingredients'][0]['name'], 'apple')
         self.assertEqual(res.data['ingredients'][1]['name'], 'banana')
 
+    def test_create_recipe_with_duplicate_ingredients_error(self):
+        """Test listing an ingredient twice is rejected."""
+        payload = {
+            'title': 'Bread',
+            'time_minutes': 60,
+            'price': Decimal('3.00'),
+            'ingredients': [
+                {'name': 'flour', 'quantity': 200, 'measurement': 'g'},
+                {'name': 'flour', 'quantity': 50, 'measurement': 'g'},
+            ],
+        }
+        res = self.client.post(RECIPE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ingredients', res.data)
+        self.assertFalse(Recipe.objects.filter(user=self.user).exists())
+
     def test_create_recipe_with_existing_ingredients(self):
         """Test creating a new recipe with existing ingredients"""
         Ingredient.objects.create(name='apple', user=self.user)
@@ -321,8 +375,33 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         recipe.refresh_from_db()
         self.assertEqual(recipe.ingredients.count(), 2)
-        self.assertEqual(recipe.ingredients.get(name='apple').quantity, 3)
-        self.assertEqual(recipe.ingredients.get(name='banana').quantity, 3)
+        for item in recipe.recipe_ingredients.all():
+            self.assertEqual(item.quantity, 3)
+
+    def test_ingredients_shared_across_recipes(self):
+        """Test the same ingredient with different quantities is reused"""
+        for quantity in (200, 250):
+            payload = {
+                'title': 'Bread',
+                'time_minutes': 60,
+                'price': Decimal('2.00'),
+                'ingredients': [
+                    {'name': 'flour', 'quantity': quantity,
+                     'measurement': 'g'},
+                ],
+            }
+            res = self.client.post(RECIPE_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(res.data['ingredients'][0]['quantity'], quantity)
+
+        flour = Ingredient.objects.get(user=self.user, name='flour')
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(
+            sorted(flour.recipe_ingredients.values_list(
+                'quantity', flat=True
+            )),
+            [200, 250],
+        )
 
     def test_clear_recipe_ingredients(self):
         """Test clearing the ingredients of a recipe"""
@@ -414,6 +493,231 @@ class PrivateRecipeApiTests(TestCase):
         self.assertIn(s3.data, res.data)
         self.assertNotIn(s4.data, res.data)
 
+    def test_recipes_matching_several_tags_listed_once(self):
+        """Test recipes matching more than one tag are not repeated."""
+        tag1 = Tag.objects.create(user=self.user, name='Vegan')
+        tag2 = Tag.objects.create(user=self.user, name='Dinner')
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(tag1, tag2)
+
+        res = self.client.get(RECIPE_URL, {'tags': f'{tag1.id},{tag2.id}'})
+
+        self.assertEqual([item['id'] for item in res.data], [recipe.id])
+
+    def test_list_ordering(self):
+        """Test sorting recipes by a field in either direction."""
+        cheap = create_recipe(self.user, title='B', price=Decimal('2'))
+        pricey = create_recipe(self.user, title='A', price=Decimal('9'))
+        also_cheap = create_recipe(self.user, title='C', price=Decimal('2'))
+
+        for ordering, expected in (
+            ('price', [cheap, also_cheap, pricey]),
+            ('-price', [pricey, also_cheap, cheap]),
+            ('title', [pricey, cheap, also_cheap]),
+            ('id', [cheap, pricey, also_cheap]),
+        ):
+            res = self.client.get(RECIPE_URL, {'ordering': ordering})
+            self.assertEqual(
+                [item['id'] for item in res.data],
+                [recipe.id for recipe in expected],
+            )
+
+    def test_list_invalid_ordering(self):
+        """Test sorting by unsupported fields is rejected."""
+        for ordering in ('description', '--price'):
+            res = self.client.get(RECIPE_URL, {'ordering': ordering})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_range_filters(self):
+        """Test filtering recipes by price and time ranges."""
+        create_recipe(self.user, price=Decimal('3'), time_minutes=10)
+        match = create_recipe(self.user, price=Decimal('6'), time_minutes=20)
+        create_recipe(self.user, price=Decimal('12'), time_minutes=20)
+        create_recipe(self.user, price=Decimal('6'), time_minutes=60)
+
+        res = self.client.get(RECIPE_URL, {
+            'min_price': '5', 'max_price': '10.50', 'max_time': 30,
+        })
+
+        self.assertEqual([item['id'] for item in res.data], [match.id])
+
+    def test_list_invalid_range_filter(self):
+        """Test non-numeric range filters are rejected."""
+        for params in (
+            {'max_time': '1.5'}, {'min_price': 'cheap'}, {'max_price': 'NaN'},
+        ):
+            res = self.client.get(RECIPE_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_sparse_fields(self):
+        """Test limiting list output and columns with `fields`."""
+        recipe = create_recipe(self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='vegan'))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPE_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{'id': recipe.id, 'title': recipe.title}])
+        # The first query is the rate limit check.
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[1]['sql'])
+        self.assertNotIn('price', queries[1]['sql'])
+
+    def test_list_prefetches_requested_relations(self):
+        """Test requested relations are prefetched, not fetched per row."""
+        tag = Tag.objects.create(user=self.user, name='vegan')
+        for i in range(3):
+            create_recipe(self.user, title=f'recipe {i}').tags.add(tag)
+
+        with self.assertNumQueries(4):
+            res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(
+            res.data[0]['tags'], [{'id': tag.id, 'name': 'vegan'}]
+        )
+
+    def test_detail_sparse_fields(self):
+        """Test limiting detail output with `fields`."""
+        recipe = create_recipe(self.user)
+
+        res = self.client.get(
+            detail_url(recipe.id), {'fields': 'id,description'}
+        )
+
+        self.assertEqual(
+            res.data, {'id': recipe.id, 'description': recipe.description}
+        )
+
+    def test_unknown_sparse_field_error(self):
+        """Test requesting an unknown field returns an error."""
+        res = self.client.get(RECIPE_URL, {'fields': 'id,user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_sideloaded(self):
+        """Test the sideloaded list lists shared relations once."""
+        tag = Tag.objects.create(user=self.user, name='vegan')
+        salt = Ingredient.objects.create(user=self.user, name='salt')
+        recipe1 = create_recipe(self.user, title='recipe 1')
+        recipe2 = create_recipe(self.user, title='recipe 2')
+        for recipe in (recipe1, recipe2):
+            recipe.tags.add(tag)
+            recipe.ingredients.add(salt)
+
+        with self.assertNumQueries(4):
+            res = self.client.get(RECIPE_URL, {'sideload': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['id'] for recipe in res.data['recipes']],
+            [recipe2.id, recipe1.id],
+        )
+        self.assertEqual(res.data['recipes'][0]['tags'], [tag.id])
+        self.assertEqual(res.data['recipes'][0]['ingredients'], [
+            {'id': salt.id, 'quantity': None, 'measurement': None},
+        ])
+        self.assertEqual(res.data['tags'], {tag.id: {
+            'id': tag.id, 'name': 'vegan',
+        }})
+        self.assertEqual(list(res.data['ingredients']), [salt.id])
+
+    def test_list_sideloaded_sparse_fields(self):
+        """Test sideloaded maps are omitted for unrequested relations."""
+        create_recipe(self.user)
+
+        res = self.client.get(
+            RECIPE_URL, {'sideload': 1, 'fields': 'id,tags'}
+        )
+
+        self.assertIn('tags', res.data)
+        self.assertNotIn('ingredients', res.data)
+
+    def test_list_sideload_flag_spellings(self):
+        """Test the sideload flag accepts true/false spellings."""
+        create_recipe(self.user)
+
+        res = self.client.get(RECIPE_URL, {'sideload': 'true'})
+        self.assertIn('recipes', res.data)
+
+        res = self.client.get(RECIPE_URL, {'sideload': 'No'})
+        self.assertIsInstance(res.data, list)
+
+        res = self.client.get(RECIPE_URL, {'sideload': 'maybe'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('sideload', res.data)
+
+    def test_list_sideloaded_paginated(self):
+        """Test paginating the sideloaded list."""
+        vegan = Tag.objects.create(user=self.user, name='vegan')
+        quick = Tag.objects.create(user=self.user, name='quick')
+        recipe1 = create_recipe(self.user, title='recipe 1')
+        recipe2 = create_recipe(self.user, title='recipe 2')
+        recipe1.tags.add(vegan)
+        recipe2.tags.add(quick)
+
+        res = self.client.get(RECIPE_URL, {'sideload': 1, 'page_size': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 2)
+        self.assertFalse(res.data['count_is_approximate'])
+        self.assertIn('page=2', res.data['next'])
+        results = res.data['results']
+        self.assertEqual(
+            [recipe['id'] for recipe in results['recipes']], [recipe2.id]
+        )
+        self.assertEqual(list(results['tags']), [quick.id])
+
+    def test_list_columnar(self):
+        """Test streaming the list in the columnar format."""
+        tag = Tag.objects.create(user=self.user, name='vegan')
+        recipe1 = create_recipe(self.user, price=Decimal('2.50'))
+        recipe2 = create_recipe(self.user, title='recipe 2')
+        recipe2.tags.add(tag)
+
+        res = self.client.get(
+            RECIPE_URL, {'fields': 'id,price,tags'},
+            HTTP_ACCEPT='application/vnd.recipe.columnar+json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(
+            res['Content-Type'], 'application/vnd.recipe.columnar+json'
+        )
+        body = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(body, {
+            'columns': ['id', 'price', 'tags'],
+            'rows': [
+                [recipe2.id, '5.50', [tag.id]],
+                [recipe1.id, '2.50', []],
+            ],
+        })
+
+    def test_list_columnar_ignores_page_size(self):
+        """Test the columnar stream always lists every recipe."""
+        create_recipe(self.user)
+        create_recipe(self.user, title='recipe 2')
+
+        res = self.client.get(
+            RECIPE_URL, {'fields': 'id', 'page_size': 1},
+            HTTP_ACCEPT='application/vnd.recipe.columnar+json',
+        )
+
+        body = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(len(body['rows']), 2)
+
+    def test_detail_ignores_columnar(self):
+        """Test non-list actions render plain JSON with the columnar type."""
+        recipe = create_recipe(self.user)
+
+        res = self.client.get(
+            detail_url(recipe.id),
+            HTTP_ACCEPT='application/vnd.recipe.columnar+json',
+        )
+
+        self.assertEqual(json.loads(res.content)['id'], recipe.id)
+
 
 class ImageUpdateTestCase(TestCase):
     """Test for upload images API"""
@@ -453,6 +757,9 @@ class ImageUpdateTestCase(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('image', res.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
+        # The cached details include the new image.
+        res = self.client.get(detail_url(self.recipe.id))
+        self.assertTrue(res.data['image'].endswith(self.recipe.image.url))
 
     def test_upload_invalid_image(self):
         """Test uploading an invalid image file"""
@@ -464,4 +771,346 @@ class ImageUpdateTestCase(TestCase):
 
         # Assert that the request results in a bad request status
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeFacetsApiTests(TestCase):
+    """Test the recipe facets API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='test@example.com',
+            password='password123',
+        )
+        self.client.force_authenticate(self.user)
+        self.vegan = Tag.objects.create(user=self.user, name='vegan')
+        self.quick = Tag.objects.create(user=self.user, name='quick')
+        self.salt = Ingredient.objects.create(user=self.user, name='salt')
+        r1 = create_recipe(self.user, price=Decimal('3.00'), time_minutes=10)
+        r2 = create_recipe(self.user, price=Decimal('7.50'), time_minutes=20)
+        r3 = create_recipe(self.user, price=Decimal('4.00'), time_minutes=50)
+        r1.tags.add(self.vegan, self.quick)
+        r2.tags.add(self.vegan)
+        r2.ingredients.add(self.salt)
+        r3.ingredients.add(self.salt)
+        other = create_user(email='other@example.com', password='pass1234')
+        create_recipe(other)
+
+    def test_facet_counts(self):
+        """Test counts and histograms over all the user's recipes."""
+        res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['count'], 3)
+        self.assertEqual(res.data['tags'], [
+            {'id': self.vegan.id, 'name': 'vegan', 'count': 2},
+            {'id': self.quick.id, 'name': 'quick', 'count': 1},
+        ])
+        self.assertEqual(res.data['ingredients'], [
+            {'id': self.salt.id, 'name': 'salt', 'count': 2},
+        ])
+        self.assertEqual(res.data['price'], [
+            {'min': '0.00', 'max': '5.00', 'count': 2},
+            {'min': '5.00', 'max': '10.00', 'count': 1},
+        ])
+        self.assertEqual(res.data['time_minutes'], [
+            {'min': 0, 'max': 15, 'count': 1},
+            {'min': 15, 'max': 30, 'count': 1},
+            {'min': 45, 'max': 60, 'count': 1},
+        ])
+
+    def test_facets_follow_filters(self):
+        """Test facets only count recipes matching the filters."""
+        res = self.client.get(FACETS_URL, {'tags': f'{self.quick.id}'})
+
+        self.assertEqual(res.data['count'], 1)
+        self.assertEqual(
+            [tag['name'] for tag in res.data['tags']], ['quick', 'vegan']
+        )
+        self.assertEqual(res.data['ingredients'], [])
+
+    def test_invalid_bucket_widths(self):
+        """Test non-numeric, non-finite or non-positive widths are 400s."""
+        for params in (
+            {'price_bucket': 'abc'}, {'price_bucket': 'NaN'},
+            {'price_bucket': 'Infinity'}, {'price_bucket': '0'},
+            {'time_bucket': 'x'}, {'time_bucket': '-15'},
+        ):
+            res = self.client.get(FACETS_URL, params)
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, params
+            )
+
+    def test_invalid_id_filters(self):
+        """Test non-numeric tag and ingredient IDs are 400s."""
+        for url in (FACETS_URL, RECIPE_URL):
+            for params in ({'tags': 'abc'}, {'ingredients': '1,x'}):
+                res = self.client.get(url, params)
+                self.assertEqual(
+                    res.status_code, status.HTTP_400_BAD_REQUEST, params
+                )
+
+    def test_facets_key_safe_for_memcached(self):
+        """Test long ID filters keep the cache key short and valid."""
+        ids = ','.join(str(i) for i in range(1000, 1200))
+
+        with patch('recipe.views.cache.get', return_value=None) as get:
+            self.client.get(FACETS_URL, {'tags': ids, 'ingredients': ids})
+
+        key = get.call_args[0][0]
+        self.assertLess(len(key), 200)
+        self.assertNotIn(' ', key)
+
+    def test_facets_follow_range_filters(self):
+        """Test range filters are part of the cached facets' key."""
+        res = self.client.get(FACETS_URL)
+        self.assertEqual(res.data['count'], 3)
+
+        res = self.client.get(FACETS_URL, {'max_price': '3.50'})
+        self.assertEqual(res.data['count'], 1)
+        res = self.client.get(FACETS_URL, {'max_time': 30})
+        self.assertEqual(res.data['count'], 2)
+
+    def test_facets_cached_until_data_changes(self):
+        """Test facets are cached and invalidated by writes."""
+        with self.assertNumQueries(4):
+            self.client.get(FACETS_URL)
+        with self.assertNumQueries(0):
+            self.client.get(FACETS_URL)
+
+        create_recipe(self.user, price=Decimal('1.00'), time_minutes=5)
+        res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.data['count'], 4)
+
+
+class RecipeIdempotencyApiTests(TestCase):
+    """Test writes sent with an Idempotency-Key header."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='test123')
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'title': 'Soup',
+            'time_minutes': 20,
+            'price': Decimal('4.00'),
+            'tags': [{'name': 'Dinner'}],
+        }
+
+    def post(self, key, payload=None):
+        return self.client.post(
+            RECIPE_URL, payload or self.payload, format='json',
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_first_response(self):
+        """Test a retried create returns the stored response."""
+        res1 = self.post('abc')
+
+        with self.assertNumQueries(1):
+            res2 = self.post('abc')
+
+        self.assertEqual(res2.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res2.data, res1.data)
+        self.assertEqual(res2['Idempotent-Replayed'], 'true')
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_keys_are_per_user(self):
+        """Test the same key from another user is a separate request."""
+        self.post('abc')
+        other = create_user(email='other@example.com', password='test123')
+        self.client.force_authenticate(other)
+
+        res = self.post('abc')
+
+        self.assertNotIn('Idempotent-Replayed', res)
+        self.assertEqual(Recipe.objects.filter(user=other).count(), 1)
+
+    def test_key_reused_for_other_request(self):
+        """Test reusing a key with another payload is rejected."""
+        self.post('abc')
+
+        res = self.post('abc', {**self.payload, 'title': 'Stew'})
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+
+    def test_key_in_progress(self):
+        """Test a duplicate of an unfinished request gets a conflict."""
+        self.post('abc')
+        IdempotencyKey.objects.update(status_code=None, response=None)
+
+        res = self.post('abc')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        """Test a rejected write can be retried with the same key."""
+        res = self.post('abc', {'title': 'Soup'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.post('abc')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_error_response_releases_key(self):
+        """Test a returned error response is not stored for replay."""
+        recipe = create_recipe(self.user)
+        url = image_upload_url(recipe.id)
+
+        res = self.client.post(
+            url, {'image': 'notimage'}, format='multipart',
+            HTTP_IDEMPOTENCY_KEY='abc',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_method_not_allowed_with_key(self):
+        """Test unsupported methods with a key get 405, not an error."""
+        recipe = create_recipe(self.user)
+
+        res = self.client.put(
+            RECIPE_URL, self.payload, format='json',
+            HTTP_IDEMPOTENCY_KEY='abc',
+        )
+        self.assertEqual(
+            res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+        res = self.client.post(
+            detail_url(recipe.id), self.payload, format='json',
+            HTTP_IDEMPOTENCY_KEY='def',
+        )
+        self.assertEqual(
+            res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_without_key_not_stored(self):
+        """Test writes without the header are not recorded."""
+        self.client.post(RECIPE_URL, self.payload, format='json')
+        self.client.post(RECIPE_URL, self.payload, format='json')
+
+        self.assertEqual(Recipe.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class RecipeDetailCacheApiTests(TestCase):
+    """Test serving recipe details from the write-through cache."""
+
+    def setUp(self):
+        recipe_details.clear()
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com', password='pass123')
+        self.client.force_authenticate(self.user)
+
+    def create(self, **params):
+        payload = {
+            'title': 'Soup', 'time_minutes': 10, 'price': '5.00',
+            'tags': [{'name': 'Dinner'}], **params,
+        }
+        res = self.client.post(RECIPE_URL, payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return Recipe.objects.get(id=res.data['id'])
+
+    def retrieve(self, recipe_id, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(detail_url(recipe_id), params)
+        return res, len(queries)
+
+    def test_created_recipe_served_from_cache(self):
+        """Test details written on create are served without queries."""
+        recipe = self.create()
+
+        res, queries = self.retrieve(recipe.id)
+
+        self.assertEqual(queries, 0)
+        self.assertEqual(res.data, RecipeDetailSerializer(
+            recipe, context={'request': res.wsgi_request}
+        ).data)
+        self.assertEqual(recipe_details.stats()['hits'], 1)
+
+    def test_update_writes_through(self):
+        """Test details are refreshed by updates."""
+        recipe = self.create()
+
+        self.client.patch(
+            detail_url(recipe.id), {'tags': [{'name': 'Lunch'}]},
+            format='json',
+        )
+        res, queries = self.retrieve(recipe.id)
+
+        self.assertEqual(queries, 0)
+        self.assertEqual([tag['name'] for tag in res.data['tags']], ['Lunch'])
+
+    def test_sparse_fields_from_cache(self):
+        """Test `fields` is applied to cached details."""
+        recipe = self.create()
+
+        res, queries = self.retrieve(recipe.id, fields='id,title')
+
+        self.assertEqual(queries, 0)
+        self.assertEqual(res.data, {'id': recipe.id, 'title': 'Soup'})
+
+    def test_other_writes_invalidate(self):
+        """Test writes outside the recipe API make cached details stale."""
+        recipe = self.create()
+        tag = recipe.tags.get()
+        tag.name = 'Supper'
+        tag.save()
+
+        res, queries = self.retrieve(recipe.id)
+
+        self.assertGreater(queries, 0)
+        self.assertEqual(res.data['tags'][0]['name'], 'Supper')
+        self.assertEqual(recipe_details.stats()['stale'], 1)
+        # The miss filled the cache again.
+        self.assertEqual(self.retrieve(recipe.id)[1], 0)
+
+    def test_other_users_recipe_not_found(self):
+        """Test cached details are only served to their owner."""
+        recipe = self.create()
+        other = create_user(email='other@example.com', password='pass123')
+        self.client.force_authenticate(other)
+
+        res, _ = self.retrieve(recipe.id)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_recipe_not_found(self):
+        """Test deleting a recipe drops its details."""
+        recipe = self.create()
+        self.client.delete(detail_url(recipe.id))
+
+        res, _ = self.retrieve(recipe.id)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_least_recently_used_evicted(self):
+        """Test the cache is bounded and counts evictions."""
+        cache = RecipeDetailCache(max_size=2)
+        for recipe_id in (1, 2, 3):
+            cache.set(self.user.id, recipe_id, 0, {'id': recipe_id})
+
+        self.assertEqual(cache.stats()['size'], 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertIsNone(cache.get(self.user.id, 1))
+
+    @override_settings(PROCESS_CACHE_TTL=30)
+    def test_entries_expire(self):
+        """Test entries are only trusted for the configured time."""
+        cache = RecipeDetailCache(max_size=2)
+        version = get_data_version(self.user.id)
+        with patch('core.detail_cache.time.monotonic', return_value=100):
+            cache.set(self.user.id, 1, version, {'id': 1})
+        with patch('core.detail_cache.time.monotonic', return_value=130):
+            self.assertEqual(cache.get(self.user.id, 1), {'id': 1})
+        with patch('core.detail_cache.time.monotonic', return_value=131):
+            self.assertIsNone(cache.get(self.user.id, 1))
+
 # Add a blank line at the end of the file
@@ -0,0 +1,96 @@
+"""
+Tests for the shopping list API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Ingredient
+
+SHOPPING_LIST_URL = reverse('recipe:recipe-shopping-list')
+
+
+class ShoppingListApiTests(TestCase):
+    """Test summing the ingredients of several recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_recipe(self, user=None, **ingredients):
+        """Create a recipe using `name=(quantity, measurement)` pairs."""
+        user = user or self.user
+        recipe = Recipe.objects.create(
+            user=user, title='Cake', time_minutes=10, price=Decimal('5'),
+        )
+        for name, (quantity, measurement) in ingredients.items():
+            ingredient, _ = Ingredient.objects.get_or_create(
+                user=user, name=name
+            )
+            recipe.ingredients.add(ingredient, through_defaults={
+                'quantity': quantity, 'measurement': measurement,
+            })
+        return recipe
+
+    def post(self, *recipes):
+        return self.client.post(
+            SHOPPING_LIST_URL, {'recipes': list(recipes)}, format='json'
+        )
+
+    def test_totals_by_name_and_unit(self):
+        """Test quantities are scaled, normalized and summed."""
+        cake = self.create_recipe(
+            flour=(500, 'g'), milk=(1, 'cup'), eggs=(2, 'pcs'),
+        )
+        bread = self.create_recipe(
+            flour=(1, 'Kg'), milk=(100, 'ml'), salt=(1, 'pinch'),
+        )
+
+        res = self.post(
+            {'id': cake.id, 'servings': '2'}, {'id': bread.id},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [
+            {'name': 'eggs', 'unit': 'pcs', 'quantity': '4.00'},
+            {'name': 'flour', 'unit': 'g', 'quantity': '2000.00'},
+            {'name': 'milk', 'unit': 'ml', 'quantity': '573.18'},
+            {'name': 'salt', 'unit': 'pinch', 'quantity': '1.00'},
+        ])
+
+    def test_repeated_recipe_servings_add_up(self):
+        """Test a recipe listed twice is counted with both servings."""
+        cake = self.create_recipe(flour=(500, 'g'))
+
+        res = self.post({'id': cake.id}, {'id': cake.id, 'servings': '0.5'})
+
+        self.assertEqual(res.data[0]['quantity'], '750.00')
+
+    def test_other_users_recipes_rejected(self):
+        """Test recipes of other users cannot be added."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        recipe = self.create_recipe(user=other_user, flour=(500, 'g'))
+
+        res = self.post({'id': recipe.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(recipe.id), str(res.data['recipes']))
+
+    def test_invalid_payload(self):
+        """Test empty lists and non-positive servings are rejected."""
+        cake = self.create_recipe(flour=(500, 'g'))
+
+        self.assertEqual(
+            self.post().status_code, status.HTTP_400_BAD_REQUEST
+        )
+        res = self.post({'id': cake.id, 'servings': '0'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
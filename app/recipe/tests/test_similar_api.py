@@ -0,0 +1,123 @@
+"""
+Tests for the similar recipes API.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import similarity
+from core.models import Recipe, Tag, Ingredient
+
+
+def similar_url(recipe_id):
+    """Return the similar recipes URL of a recipe."""
+    return reverse('recipe:recipe-similar', args=[recipe_id])
+
+
+class SimilarRecipesApiTests(TestCase):
+    """Test ranking recipes by shared tags and ingredients."""
+
+    def setUp(self):
+        similarity.clear_indexes()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Dinner', 'Vegan')
+        ]
+        self.ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ('Rice', 'Beans', 'Corn')
+        ]
+
+    def create_recipe(self, tags=(), ingredients=(), user=None):
+        recipe = Recipe.objects.create(
+            user=user or self.user, title='Bowl', time_minutes=10,
+            price=Decimal('5'),
+        )
+        recipe.tags.add(*(self.tags[i] for i in tags))
+        recipe.ingredients.add(*(self.ingredients[i] for i in ingredients))
+        return recipe
+
+    def test_ranked_by_weighted_jaccard(self):
+        """Test recipes are ranked by shared tags and ingredients."""
+        recipe = self.create_recipe(tags=[0], ingredients=[0, 1])
+        close = self.create_recipe(tags=[0], ingredients=[0, 1, 2])
+        tag_only = self.create_recipe(tags=[0, 1])
+        self.create_recipe(tags=[1], ingredients=[2])
+
+        res = self.client.get(similar_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data], [close.id, tag_only.id]
+        )
+        # Tags weigh 1 and ingredients 2: (1 + 4) / (1 + 6), then 1 / 6.
+        self.assertAlmostEqual(res.data[0]['similarity'], 5 / 7)
+        self.assertAlmostEqual(res.data[1]['similarity'], 1 / 6)
+        self.assertEqual(len(res.data[0]['ingredients']), 3)
+
+    def test_limit(self):
+        """Test the number of results can be limited."""
+        recipe = self.create_recipe(tags=[0])
+        newest = [self.create_recipe(tags=[0]) for _ in range(3)][-1]
+
+        res = self.client.get(similar_url(recipe.id), {'limit': 1})
+
+        self.assertEqual([item['id'] for item in res.data], [newest.id])
+        res = self.client.get(similar_url(recipe.id), {'limit': 0})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_invalidated_on_write(self):
+        """Test writes to the recipes are reflected immediately."""
+        recipe = self.create_recipe(tags=[0])
+        other = self.create_recipe()
+        self.assertEqual(self.client.get(similar_url(recipe.id)).data, [])
+
+        other.tags.add(self.tags[0])
+
+        res = self.client.get(similar_url(recipe.id))
+        self.assertEqual([item['id'] for item in res.data], [other.id])
+
+    @override_settings(PROCESS_CACHE_TTL=30)
+    def test_index_rebuilt_when_expired(self):
+        """Test indexes are only trusted for the configured time."""
+        with patch('core.similarity.time.monotonic', return_value=100):
+            index = similarity.get_index(self.user.id)
+        with patch('core.similarity.time.monotonic', return_value=130):
+            self.assertIs(similarity.get_index(self.user.id), index)
+        with patch('core.similarity.time.monotonic', return_value=131):
+            self.assertIsNot(similarity.get_index(self.user.id), index)
+
+    def test_other_users_recipe_not_found(self):
+        """Test recipes of other users cannot be queried."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        recipe = self.create_recipe(tags=[0], user=other_user)
+
+        res = self.client.get(similar_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(SIMILARITY_INDEX_MAX_SIZE=2)
+    def test_least_recently_used_index_evicted(self):
+        """Test indexes beyond the size bound are evicted."""
+        recipe = self.create_recipe(tags=[0, 1])
+        other_user = get_user_model().objects.create_user(
+            'other@example.com', 'testpass123'
+        )
+        self.create_recipe(tags=[0], user=other_user)
+
+        self.client.get(similar_url(recipe.id))
+        similarity.get_index(other_user.id)
+
+        self.assertEqual(list(similarity._indexes), [other_user.id])
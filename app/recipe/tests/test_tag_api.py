@@ -2,6 +2,7 @@
 Tests for Tag API.
 """
 from decimal import Decimal
+import json
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -137,4 +138,67 @@ class PrivateTagApiTests(TestCase):
         recipe2.tags.add(tag)
         res = self.client.get(TAG_URL, {'assigned_only': 1})
         self.assertEqual(len(res.data), 1)
+
+    def test_tags_with_counts(self):
+        """Test listing tags annotated with their recipe counts."""
+        tag1 = Tag.objects.create(user=self.user, name='Dinner')
+        tag2 = Tag.objects.create(user=self.user, name='Lunch')
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                title=f'Recipe {i}',
+                time_minutes=10,
+                price=Decimal('5.00'),
+                user=self.user,
+            )
+            recipe.tags.add(tag1)
+            if i == 0:
+                recipe.tags.add(tag2)
+
+        res = self.client.get(TAG_URL, {'with_counts': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        counts = {tag['id']: tag['recipe_count'] for tag in res.data}
+        self.assertEqual(counts, {tag1.id: 3, tag2.id: 1})
+
+    def test_tags_without_counts(self):
+        """Test recipe counts are only included when requested."""
+        Tag.objects.create(user=self.user, name='Dinner')
+
+        res = self.client.get(TAG_URL)
+
+        self.assertNotIn('recipe_count', res.data[0])
+
+    def test_tags_flag_spellings(self):
+        """Test boolean flags accept true/false spellings."""
+        Tag.objects.create(user=self.user, name='Dinner')
+
+        res = self.client.get(TAG_URL, {'with_counts': 'yes'})
+        self.assertEqual(res.data[0]['recipe_count'], 0)
+
+        res = self.client.get(TAG_URL, {'assigned_only': 'true'})
+        self.assertEqual(res.data, [])
+
+        res = self.client.get(TAG_URL, {'with_counts': 'sure'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tags_sparse_fields(self):
+        """Test limiting tag output with `fields`."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+
+        res = self.client.get(TAG_URL, {'fields': 'id'})
+
+        self.assertEqual(res.data, [{'id': tag.id}])
+
+    def test_tags_columnar(self):
+        """Test listing tags in the columnar format."""
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+
+        res = self.client.get(
+            TAG_URL, {'with_counts': 1},
+            HTTP_ACCEPT='application/vnd.recipe.columnar+json',
+        )
+
+        body = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(body['columns'], ['id', 'name', 'recipe_count'])
+        self.assertEqual(body['rows'], [[tag.id, 'Dinner', 0]])
 # Add a blank line at the end of the file
@@ -15,5 +15,7 @@ app_name = 'recipe'
 
 
 urlpatterns = [
+    path('changes/', views.RecipeChangesView.as_view(), name='changes'),
+    path('feed/', views.PublicFeedView.as_view(), name='feed'),
     path('', include(router.urls)),  # Include the URLs from the router
 ]
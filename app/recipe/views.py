@@ -5,25 +5,91 @@ from drf_spectacular.utils import (
     OpenApiTypes
 )
 
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    Count, Exists, F, FloatField, OuterRef, Prefetch, Q,
+)
+from django.db.models.functions import Cast, Floor
+
 from rest_framework import (viewsets, mixins, status)
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
+from core.authentication import SignedTokenAuthentication
+from core.cache import get_data_version
+from core.detail_cache import recipe_details
+from core.feed import get_page
+from core.pagination import EstimatedCountPagination
+from core.shopping import shopping_list
+from core.similarity import get_index
+from core.sync import changes_since
+from core.throttling import ScopedTokenBucketThrottle
+from recipe.mixins import (
+    ColumnarListMixin, IdempotencyMixin, SparseFieldsMixin,
+)
 from core.models import (
     Recipe,
     Tag,
-    Ingredient
+    Ingredient,
+    RecipeIngredient,
+    Change,
 )
 from recipe.serializers import (
     RecipeSerializer,
+    RecipeSideloadSerializer,
+    RecipeSyncSerializer,
+    ChangesSerializer,
+    PublicRecipeSerializer,
     RecipeDetailSerializer,
+    SimilarRecipeSerializer,
+    CookableRecipeSerializer,
+    ShoppingListSerializer,
+    ShoppingListItemSerializer,
     TagsSerializer,
+    TagsWithCountSerializer,
     IngredientsSerializer,
+    IngredientsWithCountSerializer,
     RecipeImageSerializer
 )
 
+FIELDS_PARAMETER = OpenApiParameter(
+    'fields',
+    OpenApiTypes.STR,
+    description="Comma-separated list of fields to include in the response.",
+)
+IDEMPOTENCY_PARAMETER = OpenApiParameter(
+    'Idempotency-Key',
+    OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Unique key for this write. Retries with the same key replay the "
+        "first response instead of repeating the write."
+    ),
+)
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'off'}
+
+
+def flag_param(request, name):
+    """Return a boolean query parameter, rejecting unknown spellings."""
+    value = request.query_params.get(name, '').strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValidationError({name: 'Must be a boolean, e.g. 1 or 0.'})
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -33,7 +99,13 @@ from recipe.serializers import (
             "database. You can filter the results "
             "by specifying tags and ingredients as query parameters."
             "The parameters should be comma-separated"
-            "integers representing the IDs of tags or ingredients."
+            "integers representing the IDs of tags or ingredients. "
+            "With `sideload=1` recipes reference tags and ingredients by "
+            "ID and each one is listed once in top-level maps; paginated "
+            "responses carry them in `results`. Send "
+            "`Accept: application/vnd.recipe.columnar+json` to stream a "
+            "compact header-plus-rows document of every match instead; "
+            "`page_size` does not apply to it."
         ),
         parameters=[
             OpenApiParameter(
@@ -44,55 +116,344 @@ from recipe.serializers import (
                 'ingredients',
                 OpenApiTypes.STR,
             ),
+            OpenApiParameter(
+                'sideload',
+                OpenApiTypes.INT, enum=[0, 1],
+                description=(
+                    "Provide `1` to return tags and ingredients once in "
+                    "top-level maps instead of inline in every recipe."
+                ),
+            ),
+            OpenApiParameter(
+                'ordering', OpenApiTypes.STR,
+                enum=[
+                    prefix + field
+                    for field in ('title', 'price', 'time_minutes', 'id')
+                    for prefix in ('', '-')
+                ],
+                description=(
+                    "Field to sort by, prefixed with `-` for descending "
+                    "order. Defaults to `-id`, newest first."
+                ),
+            ),
+            OpenApiParameter(
+                'max_time', OpenApiTypes.INT,
+                description="Only include recipes taking at most this long.",
+            ),
+            OpenApiParameter(
+                'min_price', OpenApiTypes.NUMBER,
+                description="Only include recipes costing at least this.",
+            ),
+            OpenApiParameter(
+                'max_price', OpenApiTypes.NUMBER,
+                description="Only include recipes costing at most this.",
+            ),
+            FIELDS_PARAMETER,
         ]
-    )
+    ),
+    retrieve=extend_schema(
+        parameters=[
+            FIELDS_PARAMETER,
+        ]
+    ),
+    create=extend_schema(parameters=[IDEMPOTENCY_PARAMETER]),
+    update=extend_schema(parameters=[IDEMPOTENCY_PARAMETER]),
+    partial_update=extend_schema(parameters=[IDEMPOTENCY_PARAMETER]),
+    facets=extend_schema(
+        summary="Count recipes per tag, ingredient, price and time",
+        description=(
+            "Return per-tag and per-ingredient recipe counts and price "
+            "and time histograms for the recipes matching the `tags` "
+            "and `ingredients` filters and the price and time ranges."
+        ),
+        parameters=[
+            OpenApiParameter('tags', OpenApiTypes.STR),
+            OpenApiParameter('ingredients', OpenApiTypes.STR),
+            OpenApiParameter('max_time', OpenApiTypes.INT),
+            OpenApiParameter('min_price', OpenApiTypes.NUMBER),
+            OpenApiParameter('max_price', OpenApiTypes.NUMBER),
+            OpenApiParameter(
+                'price_bucket', OpenApiTypes.NUMBER,
+                description="Width of the price histogram buckets.",
+            ),
+            OpenApiParameter(
+                'time_bucket', OpenApiTypes.INT,
+                description="Width of the time_minutes histogram buckets.",
+            ),
+        ],
+    ),
+    cookable=extend_schema(
+        summary="Rank recipes by the ingredients at hand",
+        description=(
+            "Return the recipes using any of the given ingredients, ranked "
+            "by `coverage`, the fraction of their ingredients given, then "
+            "by the number of `missing` ingredients."
+        ),
+        parameters=[
+            OpenApiParameter(
+                'ingredients', OpenApiTypes.STR, required=True,
+                description="Comma-separated IDs of the ingredients at hand.",
+            ),
+            OpenApiParameter(
+                'limit', OpenApiTypes.INT,
+                description="Maximum number of recipes to return.",
+            ),
+        ],
+    ),
+    shopping_list=extend_schema(
+        summary="Sum the ingredients of several recipes",
+        description=(
+            "Return the total quantity of every ingredient needed to make "
+            "each recipe `servings` times, by ingredient name and unit. "
+            "Compatible units are converted to a common base unit "
+            "(`g`, `ml` or `pcs`) first."
+        ),
+        responses=ShoppingListItemSerializer(many=True),
+    ),
+    similar=extend_schema(
+        summary="List the most similar recipes",
+        description=(
+            "Rank the user's other recipes by the weighted Jaccard "
+            "similarity of their tags and ingredients to this recipe. "
+            "Recipes sharing nothing with it are left out."
+        ),
+        parameters=[
+            OpenApiParameter(
+                'limit', OpenApiTypes.INT,
+                description="Maximum number of recipes to return.",
+            ),
+        ],
+    ),
 )
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    IdempotencyMixin, ColumnarListMixin, SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for listing, creating, retrieving, updating, and deleting recipes.
     """
     queryset = Recipe.objects.all()
     serializer_class = RecipeDetailSerializer  # Using the imported serializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [TokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedTokenBucketThrottle]
+    throttle_scopes = {'list': 'recipe_list', 'upload_image': 'upload'}
+    pagination_class = EstimatedCountPagination
+    prefetch_fields = {
+        'ingredients': Prefetch(
+            'recipe_ingredients',
+            queryset=RecipeIngredient.objects.select_related('ingredient'),
+        ),
+    }
+    facets_cache_timeout = 300
+    default_price_bucket = Decimal('5')
+    default_time_bucket = 15
+    # Each ordering is backed by a (user, field, id) index.
+    ordering_fields = ('title', 'price', 'time_minutes', 'id')
+    range_filters = (
+        ('max_time', 'time_minutes__lte', int),
+        ('min_price', 'price__gte', Decimal),
+        ('max_price', 'price__lte', Decimal),
+    )
+    # Page size bounds of the ranked `similar` and `cookable` lists.
+    default_limit = 10
+    max_limit = 100
 
     def _params_to_ints(self, qs):
         """ convert a list of strings to integer """
         return [int(str_id) for str_id in qs.split(',')]
 
+    def _ids_param(self, name):
+        """Return the IDs of a comma-separated filter, or None if absent."""
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return self._params_to_ints(value)
+        except ValueError:
+            raise ValidationError(
+                {name: 'Must be a comma-separated list of IDs.'}
+            )
+
+    def _range_param(self, name, cast):
+        """Return the `cast` value of a range filter, or None if absent."""
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            value = cast(value)
+        except (ArithmeticError, ValueError):
+            value = None
+        if value is None or (
+            isinstance(value, Decimal) and not value.is_finite()
+        ):
+            raise ValidationError({name: 'Must be a number.'})
+        return value
+
+    def _bucket_param(self, name, cast, default):
+        """Return a positive histogram bucket width."""
+        value = self._range_param(name, cast)
+        if value is None:
+            return default
+        if value <= 0:
+            raise ValidationError({name: 'Must be positive.'})
+        return value
+
+    def _ordering(self):
+        """Return the ORDER BY of the list, ending with a unique key."""
+        ordering = self.request.query_params.get('ordering') or '-id'
+        field = ordering.lstrip('-')
+        if field not in self.ordering_fields or ordering.count('-') > 1:
+            raise ValidationError({'ordering': (
+                f'Must be one of {", ".join(self.ordering_fields)}, '
+                'optionally prefixed with "-".'
+            )})
+        # Tie-break in the same direction so (user, field, id) indexes
+        # can be scanned in either direction.
+        if field == 'id':
+            return [ordering]
+        return [ordering, '-id' if ordering.startswith('-') else 'id']
+
     def get_queryset(self):
         """Return recipes for authenticated user"""
         # First filter by user
         queryset = self.queryset.filter(user=self.request.user)
 
         # Get query parameters
-        tags = self.request.query_params.get('tags')
-        ingredients = self.request.query_params.get('ingredients')
+        tag_ids = self._ids_param('tags')
+        ingredient_ids = self._ids_param('ingredients')
 
-        if tags:
-            tag_ids = self._params_to_ints(tags)
+        # Semi-joins instead of joins keep the rows unique without a
+        # DISTINCT, so the ordering can be read straight off an index.
+        if tag_ids:
             # Use OR condition for tags
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.filter(Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe_id=OuterRef('pk'), tag_id__in=tag_ids,
+                )
+            ))
 
-        if ingredients:
-            ingredient_ids = self._params_to_ints(ingredients)
+        if ingredient_ids:
             # Use OR condition for ingredients
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = queryset.filter(Exists(
+                RecipeIngredient.objects.filter(
+                    recipe_id=OuterRef('pk'), ingredient_id__in=ingredient_ids,
+                )
+            ))
+
+        for name, lookup, cast in self.range_filters:
+            value = self._range_param(name, cast)
+            if value is not None:
+                queryset = queryset.filter(**{lookup: value})
 
-        return queryset.distinct().order_by('-id')
+        return self.project_queryset(queryset.order_by(*self._ordering()))
+
+    def _sideload_requested(self):
+        """Return True if the sideloaded list format was requested."""
+        return flag_param(self.request, 'sideload')
 
     def get_serializer_class(self):
         """Return the serializer for the authenticated user."""
         if self.action == 'list':
+            # Both formats render relations as IDs.
+            if self._sideload_requested() or self.columnar_requested():
+                return RecipeSideloadSerializer
             return RecipeSerializer
         elif self.action == 'upload_image':
             return RecipeImageSerializer
+        elif self.action == 'similar':
+            return SimilarRecipeSerializer
+        elif self.action == 'cookable':
+            return CookableRecipeSerializer
+        elif self.action == 'shopping_list':
+            return ShoppingListSerializer
 
         return self.serializer_class
 
+    def _store_detail(self, serializer):
+        """Write the recipe's detail representation through to the cache."""
+        user_id = self.request.user.id
+        # Read the version first so later writes make the entry stale.
+        version = get_data_version(user_id)
+        recipe_details.set(
+            user_id, serializer.instance.id, version, dict(serializer.data)
+        )
+
     def perform_create(self, serializer):
         """Create a new recipe."""
-        serializer.save(user=self.request.user)
+        # One transaction for the recipe, its relations and their sync
+        # changes.
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+        self._store_detail(serializer)
+
+    def perform_update(self, serializer):
+        """Update a recipe."""
+        with transaction.atomic():
+            serializer.save()
+        self._store_detail(serializer)
+
+    def perform_destroy(self, instance):
+        """Delete a recipe."""
+        recipe_id = instance.id
+        instance.delete()
+        recipe_details.discard(recipe_id)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return a recipe, from the detail cache when possible."""
+        fields = self.get_requested_fields()
+        try:
+            recipe_id = int(kwargs[self.lookup_field])
+        except ValueError:
+            recipe_id = None
+        # Filters and format overrides take the regular path.
+        if recipe_id is None or set(request.query_params) - {'fields'}:
+            return super().retrieve(request, *args, **kwargs)
+
+        data = recipe_details.get(request.user.id, recipe_id)
+        if data is None:
+            if fields is not None:
+                return super().retrieve(request, *args, **kwargs)
+            version = get_data_version(request.user.id)
+            data = dict(self.get_serializer(self.get_object()).data)
+            recipe_details.set(request.user.id, recipe_id, version, data)
+        if fields is not None:
+            data = {name: data[name] for name in data if name in fields}
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        """List recipes, optionally with sideloaded tags and ingredients."""
+        if not self._sideload_requested() or self.columnar_requested():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        recipes = list(queryset if page is None else page)
+        serializer = self.get_serializer(recipes, many=True)
+        data = {'recipes': serializer.data}
+        # Each distinct related object is serialized once, straight from
+        # the prefetch cache.
+        for name, related_serializer, related in (
+            ('tags', TagsSerializer, lambda recipe: recipe.tags.all()),
+            ('ingredients', IngredientsSerializer, lambda recipe: (
+                item.ingredient for item in recipe.recipe_ingredients.all()
+            )),
+        ):
+            if name not in serializer.child.fields:
+                continue
+            unique = {}
+            for recipe in recipes:
+                for obj in related(recipe):
+                    unique.setdefault(obj.id, obj)
+            data[name] = {
+                obj_id: item for obj_id, item in zip(
+                    unique,
+                    related_serializer(unique.values(), many=True).data,
+                )
+            }
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
 
     @action(methods=['POST'], detail=True, url_path='upload_image')
     def upload_image(self, request, pk=None):
@@ -101,11 +462,196 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance=recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+            self._store_detail(RecipeDetailSerializer(
+                recipe, context=self.get_serializer_context()
+            ))
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _limit_param(self):
+        """Return the validated `limit` of a ranked list."""
+        try:
+            limit = int(
+                self.request.query_params.get('limit', self.default_limit)
+            )
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.max_limit:
+            raise ValidationError({
+                'limit': f'Must be between 1 and {self.max_limit}.'
+            })
+        return limit
+
+    def _ranked_response(self, ranking):
+        """Render `(recipe ID, attributes)` pairs in ranking order."""
+        recipes = self.queryset.filter(
+            user=self.request.user
+        ).prefetch_related(
+            'tags', self.prefetch_fields['ingredients']
+        ).in_bulk([recipe_id for recipe_id, _ in ranking])
+        results = []
+        for recipe_id, attrs in ranking:
+            if recipe_id in recipes:
+                for name, value in attrs.items():
+                    setattr(recipes[recipe_id], name, value)
+                results.append(recipes[recipe_id])
+        return Response(self.get_serializer(results, many=True).data)
+
+    @action(methods=['GET'], detail=True, url_path='similar')
+    def similar(self, request, pk=None):
+        """List the user's recipes sharing the most tags and ingredients."""
+        recipe = self.get_object()
+        limit = self._limit_param()
+        ranked = get_index(request.user.id).similar(recipe.id, limit)
+        return self._ranked_response([
+            (recipe_id, {'similarity': score}) for recipe_id, score in ranked
+        ])
+
+    @action(methods=['GET'], detail=False, url_path='cookable')
+    def cookable(self, request):
+        """List recipes ranked by how many of their ingredients are at hand."""
+        try:
+            ingredient_ids = self._params_to_ints(
+                request.query_params['ingredients']
+            )
+        except (KeyError, ValueError):
+            raise ValidationError({
+                'ingredients': 'A comma-separated list of IDs is required.'
+            })
+        limit = self._limit_param()
+
+        # One grouped pass over the ingredient rows of the recipes using
+        # at least one of the ingredients; the rest cover nothing.
+        candidates = RecipeIngredient.objects.filter(
+            ingredient_id__in=ingredient_ids
+        ).values('recipe_id')
+        rows = RecipeIngredient.objects.filter(
+            recipe__user=request.user, recipe_id__in=candidates,
+        ).values('recipe_id').annotate(
+            total=Count('id'),
+            covered=Count('id', filter=Q(ingredient_id__in=ingredient_ids)),
+        ).annotate(
+            coverage=Cast('covered', FloatField()) / F('total'),
+            missing=F('total') - F('covered'),
+        ).order_by('-coverage', 'missing', '-recipe_id')[:limit]
+        return self._ranked_response([
+            (row['recipe_id'], {
+                'coverage': row['coverage'], 'missing': row['missing'],
+            })
+            for row in rows
+        ])
+
+    @action(methods=['POST'], detail=False, url_path='shopping-list')
+    def shopping_list(self, request):
+        """Return the ingredient totals of the given recipes."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        servings = {}
+        for item in serializer.validated_data['recipes']:
+            servings[item['id']] = (
+                servings.get(item['id'], 0) + item['servings']
+            )
+        found = set(self.queryset.filter(
+            user=request.user, id__in=servings
+        ).values_list('id', flat=True))
+        unknown = sorted(set(servings) - found)
+        if unknown:
+            raise ValidationError({
+                'recipes': f'Unknown recipe IDs: {unknown}'
+            })
+        items = shopping_list(request.user.id, servings)
+        return Response(ShoppingListItemSerializer(items, many=True).data)
+
+    @action(methods=['GET'], detail=False, url_path='facets')
+    def facets(self, request):
+        """Return counts for the recipes matching the current filter."""
+        price_bucket = self._bucket_param(
+            'price_bucket', Decimal, self.default_price_bucket
+        )
+        time_bucket = self._bucket_param(
+            'time_bucket', int, self.default_time_bucket
+        )
+
+        # The filters are hashed to keep the key short and free of
+        # characters memcached rejects, however many IDs are given.
+        filters = [
+            sorted(set(self._ids_param(name) or ()))
+            for name in ('tags', 'ingredients')
+        ] + [
+            str(self._range_param(name, cast))
+            for name, _, cast in self.range_filters
+        ]
+        # Cached results are keyed on the data version, so any write to
+        # the user's recipes makes them unreachable.
+        key = 'recipe-facets:{}:{}:{}:{}:{}'.format(
+            request.user.id,
+            get_data_version(request.user.id),
+            hashlib.sha1(json.dumps(filters).encode()).hexdigest(),
+            price_bucket,
+            time_bucket,
+        )
+        data = cache.get(key)
+        if data is None:
+            data = self._compute_facets(price_bucket, time_bucket)
+            cache.set(key, data, self.facets_cache_timeout)
+        return Response(data)
+
+    def _compute_facets(self, price_bucket, time_bucket):
+        """Compute facet counts with one grouped query per facet."""
+        recipe_ids = self.get_queryset().order_by().values('id')
+
+        def relation_counts(through, target):
+            rows = through.objects.filter(
+                recipe_id__in=recipe_ids
+            ).values(
+                f'{target}_id', f'{target}__name'
+            ).annotate(
+                count=Count('recipe_id')
+            ).order_by('-count', f'{target}__name')
+            return [
+                {
+                    'id': row[f'{target}_id'],
+                    'name': row[f'{target}__name'],
+                    'count': row['count'],
+                }
+                for row in rows
+            ]
+
+        def histogram(field, width):
+            rows = Recipe.objects.filter(
+                id__in=recipe_ids
+            ).annotate(
+                bucket=Floor(F(field) / width)
+            ).values('bucket').annotate(
+                count=Count('id')
+            ).order_by('bucket')
+            return [
+                {
+                    'min': int(row['bucket']) * width,
+                    'max': (int(row['bucket']) + 1) * width,
+                    'count': row['count'],
+                }
+                for row in rows
+            ]
+
+        prices = histogram('price', price_bucket)
+        for bucket in prices:
+            bucket['min'] = str(bucket['min'].quantize(Decimal('0.01')))
+            bucket['max'] = str(bucket['max'].quantize(Decimal('0.01')))
+        times = histogram('time_minutes', time_bucket)
+        return {
+            'count': sum(bucket['count'] for bucket in times),
+            'tags': relation_counts(Recipe.tags.through, 'tag'),
+            'ingredients': relation_counts(
+                Recipe.ingredients.through, 'ingredient'
+            ),
+            'price': prices,
+            'time_minutes': times,
+        }
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -119,10 +665,21 @@ class RecipeViewSet(viewsets.ModelViewSet):
                     "or ingredients that are assigned to recipes."
                 ),
             ),
+            OpenApiParameter(
+                'with_counts',
+                OpenApiTypes.INT, enum=[0, 1],
+                description=(
+                    "Provide `1` to include the number of recipes "
+                    "each tag or ingredient is assigned to."
+                ),
+            ),
+            FIELDS_PARAMETER,
         ]
        ),
 )
 class BaseRecipeAttrViewSet(
+    ColumnarListMixin,
+    SparseFieldsMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -131,29 +688,201 @@ class BaseRecipeAttrViewSet(
     """
     Base class for recipe attributes (tags, ingredients).
     """
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [TokenAuthentication, SignedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = EstimatedCountPagination
+    count_serializer_class = None
+
+    def _flag(self, name):
+        """Return a boolean query parameter."""
+        return flag_param(self.request, name)
 
     def get_queryset(self):
         """Retrieve tags for the authenticated user."""
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
-        )
-        queryset = self.queryset
-        if assigned_only:
-            queryset = queryset.filter(recipes__isnull=False)
-        return queryset.filter(
-            user=self.request.user
-        ).order_by('-name').distinct()
+        queryset = self.queryset.filter(user=self.request.user)
+        if self._flag('assigned_only'):
+            # Semi-join on the through table instead of joining every
+            # assignment and deduplicating with DISTINCT.
+            relation = self.queryset.model.recipes
+            target = relation.field.m2m_reverse_field_name()
+            queryset = queryset.filter(Exists(
+                relation.through.objects.filter(**{target: OuterRef('pk')})
+            ))
+        if self.action == 'list' and self._flag('with_counts'):
+            queryset = queryset.annotate(recipe_count=Count('recipes'))
+        return self.project_queryset(queryset.order_by('-name'))
+
+    def perform_update(self, serializer):
+        """Update the object and record its sync change atomically."""
+        with transaction.atomic():
+            serializer.save()
+
+    def get_serializer_class(self):
+        """Return the serializer including recipe counts if requested."""
+        if self.action == 'list' and self._flag('with_counts'):
+            return self.count_serializer_class
+        return self.serializer_class
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
     """Serializer for Tag objects."""
     queryset = Tag.objects.all()
     serializer_class = TagsSerializer
+    count_serializer_class = TagsWithCountSerializer
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     """Serializer for Ingredient objects."""
     queryset = Ingredient.objects.all()
     serializer_class = IngredientsSerializer
+    count_serializer_class = IngredientsWithCountSerializer
+
+
+@extend_schema(
+    summary="List changes since a sync cursor",
+    description=(
+        "Return the recipes, tags and ingredients created, updated or "
+        "deleted after `since`, oldest first. Pass the returned `cursor` "
+        "as `since` until `has_more` is false; `since=0` returns all "
+        "objects."
+    ),
+    parameters=[
+        OpenApiParameter('since', OpenApiTypes.INT),
+        OpenApiParameter(
+            'limit', OpenApiTypes.INT,
+            description="Maximum number of changes in the page.",
+        ),
+    ],
+    responses=ChangesSerializer,
+)
+class RecipeChangesView(APIView):
+    """View for delta syncing recipes, tags and ingredients."""
+    authentication_classes = [TokenAuthentication, SignedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    default_limit = 500
+    max_limit = 1000
+    sections = (
+        ('recipes', Change.RECIPE, RecipeSyncSerializer),
+        ('tags', Change.TAG, TagsSerializer),
+        ('ingredients', Change.INGREDIENT, IngredientsSerializer),
+    )
+
+    def _int_param(self, name, default):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = -1
+        if value < 0:
+            raise ValidationError({name: 'Must be a non-negative integer.'})
+        return value
+
+    def _get_objects(self, model, ids):
+        """Fetch the current state of changed objects by ID."""
+        if model == Change.RECIPE:
+            queryset = Recipe.objects.prefetch_related(
+                'tags', RecipeViewSet.prefetch_fields['ingredients']
+            )
+        elif model == Change.TAG:
+            queryset = Tag.objects.all()
+        else:
+            queryset = Ingredient.objects.all()
+        return queryset.filter(user=self.request.user).in_bulk(ids)
+
+    def get(self, request):
+        since = self._int_param('since', 0)
+        limit = min(
+            self._int_param('limit', self.default_limit), self.max_limit
+        ) or self.default_limit
+        changes = changes_since(request.user.id, since, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        data = {
+            'cursor': changes[-1].id if changes else since,
+            'has_more': has_more,
+        }
+        for name, model, serializer_class in self.sections:
+            entries = [change for change in changes if change.model == model]
+            objects = self._get_objects(model, [
+                change.object_id for change in entries if not change.deleted
+            ])
+            section = {'created': [], 'updated': [], 'deleted': []}
+            for change in entries:
+                if change.deleted:
+                    section['deleted'].append(change.object_id)
+                elif change.object_id in objects:
+                    created = since == 0 or (
+                        change.created_id is not None
+                        and change.created_id > since
+                    )
+                    section['created' if created else 'updated'].append(
+                        objects[change.object_id]
+                    )
+            for kind in ('created', 'updated'):
+                section[kind] = serializer_class(
+                    section[kind], many=True, context={'request': request}
+                ).data
+            data[name] = section
+        return Response(data)
+
+
+@extend_schema(
+    summary="List public recipes",
+    description=(
+        "Return the recipes their owners made public, newest first. "
+        "Follow `next` for older recipes. Pages are the same for every "
+        "user, so image URLs are relative."
+    ),
+    parameters=[
+        OpenApiParameter(
+            'before', OpenApiTypes.INT,
+            description="Only list recipes with a lower ID.",
+        ),
+    ],
+    responses=PublicRecipeSerializer(many=True),
+)
+class PublicFeedView(APIView):
+    """View for the public recipe feed shared by all users."""
+    authentication_classes = [TokenAuthentication, SignedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+
+    def _build_page(self, before):
+        queryset = Recipe.objects.filter(is_public=True).prefetch_related(
+            'tags', RecipeViewSet.prefetch_fields['ingredients']
+        ).order_by('-id')
+        if before is not None:
+            queryset = queryset.filter(id__lt=before)
+        recipes = list(queryset[:self.page_size + 1])
+        has_more = len(recipes) > self.page_size
+        recipes = recipes[:self.page_size]
+        ids = [recipe.id for recipe in recipes]
+        page = {
+            'next': ids[-1] if has_more else None,
+            'results': list(
+                PublicRecipeSerializer(recipes, many=True).data
+            ),
+        }
+        return ids, has_more, page
+
+    def get(self, request):
+        before = request.query_params.get('before')
+        if before is not None:
+            try:
+                before = int(before)
+            except ValueError:
+                before = 0
+            if before <= 0:
+                raise ValidationError(
+                    {'before': 'Must be a positive integer.'}
+                )
+        page = get_page(
+            before, self.page_size, lambda: self._build_page(before)
+        )
+        next_url = None
+        if page['next'] is not None:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'before', page['next']
+            )
+        return Response({'next': next_url, 'results': page['results']})
@@ -10,6 +10,8 @@ from django.utils.translation import gettext as _  # For handling translations.
 
 from rest_framework import serializers
 
+from core.models import UserStats
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for the user object."""
@@ -66,3 +68,28 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class SignedTokenSerializer(serializers.Serializer):
+    """Serializer for issued signed access and refresh tokens."""
+    access = serializers.CharField()
+    refresh = serializers.CharField()
+    expires_in = serializers.IntegerField()
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """Serializer for exchanging a refresh token."""
+    refresh = serializers.CharField(trim_whitespace=False)
+
+
+class UserStatsSerializer(serializers.ModelSerializer):
+    """Serializer for the user's recipe statistics."""
+    average_time_minutes = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = UserStats
+        fields = [
+            'recipe_count', 'tag_count', 'ingredient_count',
+            'average_time_minutes', 'price_min', 'price_max',
+        ]
+        read_only_fields = fields
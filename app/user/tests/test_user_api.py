@@ -2,16 +2,25 @@
 Test for user API.
 """
 
+from decimal import Decimal
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from core.models import Recipe, Tag, UserStats, UserDeletion
+
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
+SIGNED_TOKEN_URL = reverse('user:token-signed')
+REFRESH_URL = reverse('user:token-refresh')
+REVOKE_URL = reverse('user:token-revoke')
 ME_URL = reverse('user:me')
+STATS_URL = reverse('user:stats')
+RECIPE_URL = reverse('recipe:recipe-list')
 
 
 def create_user(**params):
@@ -168,3 +177,184 @@ class PrivateUserTests(TestCase):
             response.status_code,
             status.HTTP_405_METHOD_NOT_ALLOWED
         )
+
+    def test_delete_me_deactivates_user(self):
+        """Test deleting the account deactivates it and queues a purge"""
+        Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=5, price='2.00'
+        )
+
+        response = self.client.delete(ME_URL)
+        self.user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(Recipe.objects.filter(user=self.user).exists())
+        deletion = UserDeletion.objects.get(user=self.user)
+        self.assertEqual(deletion.total_objects, 1)
+
+
+class UserStatsApiTests(TestCase):
+    """Test the incrementally maintained user statistics"""
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@example.com',
+            password='password123',
+            name='Test User'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_recipe(self, price, time_minutes, **extra):
+        """Create a recipe through the API and return its id."""
+        payload = {
+            'title': 'Recipe',
+            'time_minutes': time_minutes,
+            'price': price,
+        }
+        payload.update(extra)
+        res = self.client.post(RECIPE_URL, payload, format='json')
+        return res.data['id']
+
+    def test_stats_requires_auth(self):
+        """Test authentication is required for the stats endpoint"""
+        response = APIClient().get(STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_track_writes(self):
+        """Test creates, updates and deletes are reflected in the stats"""
+        self._create_recipe(
+            '10.00', 30, tags=[{'name': 'vegan'}],
+            ingredients=[{'name': 'salt'}, {'name': 'flour'}],
+        )
+        cheap = self._create_recipe('2.00', 10, tags=[{'name': 'vegan'}])
+        self._create_recipe('6.00', 20)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(STATS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'recipe_count': 3,
+            'tag_count': 1,
+            'ingredient_count': 2,
+            'average_time_minutes': 20.0,
+            'price_min': '2.00',
+            'price_max': '10.00',
+        })
+
+        self.client.patch(
+            reverse('recipe:recipe-detail', args=[cheap]),
+            {'price': '4.00', 'time_minutes': 40},
+        )
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual(stats.price_min, Decimal('4.00'))
+        self.assertEqual(stats.time_minutes_total, 90)
+
+        self.client.delete(reverse('recipe:recipe-detail', args=[cheap]))
+        Tag.objects.filter(user=self.user).delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.recipe_count, 2)
+        self.assertEqual(stats.tag_count, 0)
+        self.assertEqual(stats.price_min, Decimal('6.00'))
+        self.assertEqual(stats.average_time_minutes, 25.0)
+
+    def test_stats_built_when_missing(self):
+        """Test stats are computed on read for users without a row"""
+        Recipe.objects.create(
+            user=self.user, title='Recipe', time_minutes=5,
+            price=Decimal('3.00'),
+        )
+        UserStats.objects.filter(user=self.user).delete()
+
+        response = self.client.get(STATS_URL)
+
+        self.assertEqual(response.data['recipe_count'], 1)
+        self.assertEqual(response.data['price_max'], '3.00')
+
+
+class SignedTokenApiTests(TestCase):
+    """Test the stateless signed access tokens"""
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@example.com',
+            password='password123',
+            name='Test User'
+        )
+        self.client = APIClient()
+
+    def _issue(self):
+        response = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'test@example.com', 'password': 'password123',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def _bearer(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_signed_token_authenticates_without_queries(self):
+        """Test recipe requests with a signed token skip the token table"""
+        tokens = self._issue()
+        self._bearer(tokens['access'])
+        self.client.get(STATS_URL)
+
+        with self.assertNumQueries(2):
+            # The rate limit check and the recipe query.
+            response = self.client.get(RECIPE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_signed_token_on_me(self):
+        """Test the profile endpoint accepts signed tokens"""
+        self._bearer(self._issue()['access'])
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.data['email'], 'test@example.com')
+
+    def test_invalid_signed_token(self):
+        """Test tampered tokens are rejected"""
+        self._bearer(self._issue()['access'] + 'x')
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_expired_signed_token(self):
+        """Test access tokens stop working after their lifetime"""
+        access = self._issue()['access']
+        self._bearer(access)
+
+        with self.settings(ACCESS_TOKEN_LIFETIME=-1):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_rotates_token(self):
+        """Test a refresh token yields new tokens exactly once"""
+        refresh = self._issue()['refresh']
+
+        response = self.client.post(REFRESH_URL, {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['refresh'], refresh)
+
+        response = self.client.post(REFRESH_URL, {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_revoke_tokens(self):
+        """Test revoking invalidates access and refresh tokens"""
+        tokens = self._issue()
+        self._bearer(tokens['access'])
+
+        response = self.client.post(REVOKE_URL)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(REFRESH_URL, {
+            'refresh': tokens['refresh'],
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
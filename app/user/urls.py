@@ -10,5 +10,21 @@ app_name = 'user'
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
+    path(
+        'token/signed/',
+        views.CreateSignedTokenView.as_view(),
+        name='token-signed',
+    ),
+    path(
+        'token/refresh/',
+        views.RefreshTokenView.as_view(),
+        name='token-refresh',
+    ),
+    path(
+        'token/revoke/',
+        views.RevokeTokensView.as_view(),
+        name='token-revoke',
+    ),
     path('me/', views.ManageTokenView.as_view(), name='me'),
+    path('stats/', views.UserStatsView.as_view(), name='stats'),
 ]
@@ -1,14 +1,29 @@
+from django.contrib.auth import get_user_model
+from drf_spectacular.utils import extend_schema
 # Import necessary modules and classes from the rest_framework library
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, authentication, permissions, status
 # Import the base class for creating views that handle HTTP POST requests
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 # Import the API settings from Django REST framework for global settings
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from core.authentication import (
+    SignedTokenAuthentication, issue_tokens, revoke_tokens,
+    rotate_refresh_token,
+)
+from core.models import UserStats
+from core.purge import request_user_deletion
+from core.stats import recompute_stats
+from core.throttling import ScopedTokenBucketThrottle
 # Import the serializers we defined for user and token creation
 from user.serializers import (
     UserSerializer,  # Serializer to handle user data
-    AuthTokenSerializer  # Serializer to handle authentication token data
+    AuthTokenSerializer,  # Serializer to handle authentication token data
+    UserStatsSerializer,  # Serializer to handle user statistics
+    SignedTokenSerializer,  # Serializer for signed access tokens
+    RefreshTokenSerializer,  # Serializer to exchange refresh tokens
 )
 
 
@@ -27,18 +42,103 @@ class CreateTokenView(ObtainAuthToken):
     """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [ScopedTokenBucketThrottle]
+    throttle_scope = 'token'
+
+
+class CreateSignedTokenView(CreateTokenView):
+    """
+    View for creating a signed access token and a refresh token.
+    Access tokens are verified without a database lookup.
+    """
+
+    @extend_schema(responses=SignedTokenSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(issue_tokens(serializer.validated_data['user']))
+
+
+class RefreshTokenView(APIView):
+    """
+    View for exchanging a refresh token for new tokens.
+    Each refresh token can only be used once.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedTokenBucketThrottle]
+    throttle_scope = 'token'
+
+    @extend_schema(
+        request=RefreshTokenSerializer, responses=SignedTokenSerializer
+    )
+    def post(self, request):
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            rotate_refresh_token(serializer.validated_data['refresh'])
+        )
 
 
-class ManageTokenView(generics.RetrieveUpdateAPIView):
+class RevokeTokensView(APIView):
+    """
+    View for revoking all signed access and refresh tokens of the user.
+    """
+    authentication_classes = [
+        authentication.TokenAuthentication, SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=None, responses={204: None})
+    def post(self, request):
+        revoke_tokens(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ManageTokenView(generics.RetrieveUpdateDestroyAPIView):
     """
     View for managing the user's auth token.
+    Deleting deactivates the account at once; the data is purged later.
     """
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        authentication.TokenAuthentication, SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """
         Return the authenticated user.
         """
-        return self.request.user
+        user = self.request.user
+        if user.get_deferred_fields():
+            # Signed tokens only carry the id; load the rest once.
+            user = get_user_model().objects.get(pk=user.pk)
+        return user
+
+    def perform_destroy(self, instance):
+        """Queue the user for background deletion."""
+        request_user_deletion(instance)
+
+
+class UserStatsView(generics.RetrieveAPIView):
+    """
+    View for the authenticated user's recipe statistics.
+    Stats are maintained on write, so reading them is a single lookup.
+    """
+    serializer_class = UserStatsSerializer
+    authentication_classes = [
+        authentication.TokenAuthentication, SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self):
+        """
+        Return the stats row, building it if it does not exist yet.
+        """
+        user_id = self.request.user.id
+        try:
+            return UserStats.objects.get(user_id=user_id)
+        except UserStats.DoesNotExist:
+            recompute_stats([user_id])
+            return UserStats.objects.get(user_id=user_id)